@@ -0,0 +1,118 @@
+# --- Çift okuma uyum analizi ---
+# İki okuyucunun aynı vakaya verdiği BI-RADS kategorilerini eşler; karışıklık
+# matrisi, Cohen kappa (ağırlıksız, lineer, kuadratik) ve uyumsuz vaka listesini
+# NumPy/pandas ile vektörel hesaplar (yüz binlerce çift saniyenin altında).
+# Ağırlıklı kappa ve uyumsuzluk adımı kategori skalasındaki sıraya değil şüphe
+# sırasına (SUSPICION_ORDER) göre hesaplanır: BI-RADS 0, 1 ile 2'nin yanında değil
+# 3 ile 4A arasında yer alır.
+
+import numpy as np
+import pandas as pd
+
+from birads_rules import CATEGORIES, suspicion_rank
+
+# Biyopsi eşiği: 4A ve üzeri
+BIOPSY_CATEGORIES = ["BI-RADS 4A", "BI-RADS 4B", "BI-RADS 4C", "BI-RADS 5", "BI-RADS 6"]
+# CATEGORIES kodu -> şüphe sırası
+SUSPICION_RANKS = np.array([suspicion_rank(c) for c in CATEGORIES])
+
+
+def reader_pairs(history):
+    """Geçmiş kayıtlarından vaka başına ilk iki farklı okuyucunun son kararını eşler."""
+    df = history.dropna(subset=["case_id", "reader", "category"])
+    df = df[(df["case_id"] != "") & (df["reader"] != "")].sort_values("time", kind="stable")
+
+    # Vaka/okuyucu tamsayı kodlarına çevrilir; gruplama string yerine int üzerinde yapılır
+    case, cases = pd.factorize(df["case_id"])
+    reader, _ = pd.factorize(df["reader"])
+    key = case.astype(np.int64) * (reader.max() + 1 if len(reader) else 1) + reader
+    _, first = np.unique(key, return_index=True)
+    _, last_reversed = np.unique(key[::-1], return_index=True)
+    last = len(key) - 1 - last_reversed
+
+    # Okuyucu sırası: vakayı ilk kaydeden okuyucu A, ikinci okuyucu B
+    order = np.lexsort((first, case[first]))
+    first, last = first[order], last[order]
+    group = case[first]
+    positions = np.arange(len(group))
+    is_start = np.r_[True, group[1:] != group[:-1]] if len(group) else np.zeros(0, dtype=bool)
+    rank = positions - np.maximum.accumulate(np.where(is_start, positions, 0))
+    b = np.flatnonzero(rank == 1)
+    a = b - 1
+
+    readers = df["reader"].to_numpy()
+    categories = df["category"].to_numpy()
+    return pd.DataFrame({
+        "case_id": cases[group[b]],
+        "reader_a": readers[last[a]],
+        "reader_b": readers[last[b]],
+        "category_a": categories[last[a]],
+        "category_b": categories[last[b]],
+    })
+
+
+def encode(categories):
+    codes = pd.Categorical(categories, categories=CATEGORIES).codes
+    if (codes < 0).any():
+        unknown = sorted(set(pd.Series(categories)[codes < 0].astype(str)))
+        raise ValueError(f"Tanınmayan BI-RADS kategorisi: {', '.join(unknown)}")
+    return codes.astype(np.intp)
+
+
+def confusion_matrix(codes_a, codes_b, k=len(CATEGORIES)):
+    return np.bincount(codes_a * k + codes_b, minlength=k * k).reshape(k, k)
+
+
+def kappa(cm, weights=None, ranks=SUSPICION_RANKS):
+    """Cohen kappa; weights None (ağırlıksız), "linear" veya "quadratic".
+
+    Ağırlıklar satır/sütunların ranks ile verilen sıralı konumları arasındaki farktan hesaplanır.
+    """
+    k = cm.shape[0]
+    n = cm.sum()
+    if n == 0:
+        return float("nan")
+    i, j = np.indices((k, k))
+    d = np.abs(ranks[i] - ranks[j]) / (k - 1)
+    if weights is None:
+        w = (i != j).astype(float)
+    elif weights == "linear":
+        w = d
+    elif weights == "quadratic":
+        w = d ** 2
+    else:
+        raise ValueError(f"Bilinmeyen ağırlık: {weights}")
+    observed = cm / n
+    expected = np.outer(cm.sum(axis=1), cm.sum(axis=0)) / n ** 2
+    denominator = (w * expected).sum()
+    if denominator == 0:
+        return 1.0
+    return float(1 - (w * observed).sum() / denominator)
+
+
+def discordance(pairs, codes_a=None, codes_b=None):
+    codes_a = encode(pairs["category_a"]) if codes_a is None else codes_a
+    codes_b = encode(pairs["category_b"]) if codes_b is None else codes_b
+    mask = codes_a != codes_b
+    biopsy = np.isin(np.asarray(CATEGORIES), BIOPSY_CATEGORIES)
+    out = pairs.loc[mask].copy()
+    out["step"] = np.abs(SUSPICION_RANKS[codes_a] - SUSPICION_RANKS[codes_b])[mask]
+    # Klinik açıdan anlamlı uyumsuzluk: okuyuculardan yalnızca biri biyopsi önermiş
+    out["management_change"] = (biopsy[codes_a] != biopsy[codes_b])[mask]
+    return out.sort_values(["management_change", "step"], ascending=False, kind="stable")
+
+
+def analyze(pairs):
+    codes_a = encode(pairs["category_a"])
+    codes_b = encode(pairs["category_b"])
+    cm = confusion_matrix(codes_a, codes_b)
+    n = int(cm.sum())
+    return {
+        "n_pairs": n,
+        "agreement": float(np.trace(cm) / n) if n else float("nan"),
+        "kappa": kappa(cm),
+        "kappa_linear": kappa(cm, "linear"),
+        "kappa_quadratic": kappa(cm, "quadratic"),
+        "confusion": pd.DataFrame(cm, index=CATEGORIES, columns=CATEGORIES),
+        "discordant": discordance(pairs, codes_a, codes_b),
+    }
@@ -1,7 +1,24 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import pandas as pd
+import sqlite3
 import sys
 import os
 
+from birads_rules import (
+    FINDING_TYPES, SHAPES, BENIGN_MORPHS, CALC_MORPHS, ASYM_TYPES,
+    margin_options, calc_dist_options, classify,
+)
+from birads_localization import SIDES, VIEWS, make_finding, build_lesions, classify_lesions, reconcile
+from birads_history import append_record
+from birads_density import MAX_PIXELS, estimate_density
+from birads_calcs import PIXEL_SPACING_MM, analyze_calcifications
+from birads_upload import process_upload, open_pixels
+from birads_cache import shared_cached, example_image
+from birads_snapshot import FORM_FIELDS, new_token, load_snapshot, save_snapshot
+from birads_shorthand import parse as parse_shorthand, parse_bulk
+from birads_export import exporter, enqueue_export
+
 # Sayfa başlığı ve favicon değiştir
 st.set_page_config(
     page_title="Radiologean - BI-RADS App",
@@ -11,17 +28,109 @@ st.set_page_config(
 
 def display_result(category, explanation, management, reference_detail, image_path=None, extra_note=None):
     css_class = "birads-" + category.split()[1].lower()
-    st.markdown(
-        f'<div class="result-card {css_class}">{category}<br>{explanation}<br><small>{management}</small></div>',
-        unsafe_allow_html=True
-    )
+    card = f'<div class="result-card {css_class}">{category}<br>{explanation}<br><small>{management}</small></div>'
+    density = st.session_state.get("density")
+    if density:
+        # Meme yoğunluğu sonucu BI-RADS kartının yanında gösterilir
+        col_result, col_density = st.columns([3, 1])
+        col_result.markdown(card, unsafe_allow_html=True)
+        col_density.markdown(
+            f'<div class="result-card density-{density["acr"]}">ACR {density["acr"]}<br>'
+            f'%{density["percent"]:.0f} fibroglandüler<br><small>{density["label"]}</small></div>',
+            unsafe_allow_html=True
+        )
+    else:
+        st.markdown(card, unsafe_allow_html=True)
     if extra_note:
         st.info(extra_note)
     if image_path and os.path.exists(image_path):
-        st.image(image_path, caption=f"{category} örnek mamografi", use_container_width=True)
+        st.image(example_image(image_path), caption=f"{category} örnek mamografi", use_container_width=True)
     if reference_detail:
         st.info(f"📖 {reference_detail}")
 
+def show_localization(form):
+    # CC/MLO lokalizasyonu: aynı lezyon iki kez sayılmasın, tek projeksiyon bulguları ayrılsın.
+    # (lezyonlar, lezyon sonuçları, en yüksek lezyon kategorisi) döner; sonuç kartı reconcile ile güncellenir
+    with st.expander("📍 Lezyon Lokalizasyonu (CC/MLO eşleştirme)"):
+        rows = st.data_editor(
+            pd.DataFrame({
+                "Bulgu": pd.Series(dtype="str"),
+                "Taraf": pd.Series(dtype="str"),
+                "Görünüm": pd.Series(dtype="str"),
+                "Saat": pd.Series(dtype="float"),
+                "Meme başına uzaklık (cm)": pd.Series(dtype="float"),
+            }),
+            num_rows="dynamic",
+            column_config={
+                "Bulgu": st.column_config.SelectboxColumn(options=FINDING_TYPES, required=True),
+                "Taraf": st.column_config.SelectboxColumn(options=SIDES, required=True),
+                "Görünüm": st.column_config.SelectboxColumn(options=VIEWS, required=True),
+                "Saat": st.column_config.NumberColumn(min_value=0.5, max_value=12, step=0.5, required=True),
+                "Meme başına uzaklık (cm)": st.column_config.NumberColumn(min_value=0, step=0.1, required=True),
+            },
+            key="localization_rows",
+            use_container_width=True,
+        )
+        findings = [
+            make_finding(r["Bulgu"], r["Taraf"], r["Görünüm"], r["Saat"], r["Meme başına uzaklık (cm)"], i)
+            for i, r in rows.dropna().iterrows()
+        ]
+        if not findings:
+            return [], [], None
+        lesions = build_lesions(findings)
+        results, category = classify_lesions(lesions, **form)
+        st.dataframe(pd.DataFrame([
+            {
+                "Bulgu": l["finding"],
+                "Taraf": l["side"],
+                "Saat": l["clock"],
+                "Uzaklık (cm)": l["distance_cm"],
+                "Kadran": l["quadrant"],
+                "Derinlik": l["depth"],
+                "Projeksiyon": "CC + MLO" if l["two_view"] else (l["cc"] or l["mlo"])["view"] + " (tek)",
+                "Kategori": r["category"],
+                "Not": r["extra_note"],
+            }
+            for l, r in zip(lesions, results)
+        ]), hide_index=True, use_container_width=True)
+        st.info(f"{len(findings)} bulgu girişi → {len(lesions)} lezyon. Lezyon bazında en yüksek kategori: {category}")
+        return lesions, results, category
+
+def show_save_controls(inputs, result):
+    # Sonucu geçmişe kaydet (çift okuma analizi vaka no + okuyucu ile eşleştirir)
+    with st.expander("💾 Sonucu kaydet"):
+        col1, col2 = st.columns(2)
+        case_id = col1.text_input("Vaka No", key="case_id", on_change=save_form)
+        reader = col2.text_input("Okuyucu", key="reader", on_change=save_form)
+        if st.button("Kaydet", disabled=not (case_id.strip() and reader.strip())):
+            record = append_record(case_id, reader, inputs, result)
+            st.success(f"{case_id} / {reader}: {result['category']} kaydedildi.")
+            export_records([record])
+        show_export_status()
+
+def export_records(records):
+    # Dışa aktarım kuyruğa yazılır ve arka planda gönderilir; rerun gönderimi beklemez
+    try:
+        for record in records:
+            enqueue_export(record)
+    except (ValueError, sqlite3.Error) as e:
+        st.warning(f"Dışa aktarım kuyruğuna eklenemedi: {e}")
+
+def show_export_status():
+    try:
+        exp = exporter()
+    except ValueError:
+        return  # Geçersiz adres kaydetme sırasında uyarı olarak gösterilir
+    if exp is None:
+        return
+    stats = exp.stats()
+    status = f"📤 Dışa aktarım ({exp.transport.format.upper()}): {stats['pending']} bekleyen, {stats['sent']} gönderildi"
+    if stats["failed"]:
+        status += f", {stats['failed']} reddedildi"
+    if stats["last_error"]:
+        status += f" · son hata: {stats['last_error']}"
+    st.caption(status)
+
 if getattr(sys, 'frozen', False):
     BASE_DIR = sys._MEIPASS
 else:
@@ -30,6 +139,141 @@ else:
 def img(file):
     return os.path.join(BASE_DIR, "images", file)
 
+def restore_form():
+    # Oturum belirteci URL'de tutulur; yeniden bağlanınca form tek rerun'da geri yüklenir
+    token = st.query_params.get("oturum")
+    if not token:
+        token = new_token()
+        st.query_params["oturum"] = token
+    if st.session_state.get("snapshot_token") != token:
+        st.session_state["snapshot_token"] = token
+        for key, value in load_snapshot(token).items():
+            st.session_state[key] = value
+
+def save_form():
+    # Widget on_change geri çağrısı: kayıt arka planda yazılır, rerun'ı bekletmez
+    save_snapshot(st.session_state["snapshot_token"],
+                  {k: st.session_state[k] for k in FORM_FIELDS if k in st.session_state})
+
+def session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+def load_upload(uploaded, max_pixels=None):
+    # Akışlı yükleme: geçici dosya, tek geçişte çözme + üst veri temizliği, önizleme önbelleği
+    entry = process_upload(uploaded, session_id(), max_pixels)
+    st.image(entry["display"], caption=f"{entry['shape'][1]}×{entry['shape'][0]} px", width=240)
+    if entry["removed_metadata"]:
+        st.caption("Temizlenen üst veri: " + ", ".join(entry["removed_metadata"]))
+    return entry
+
+# Sonuçlar içerik anahtarıyla süreçler arası paylaşılan önbellekte tutulur; "_entry" anahtara katılmaz
+@shared_cached("density")
+def density_from_upload(key, _entry):
+    return estimate_density(open_pixels(_entry))
+
+@shared_cached("calcs")
+def calcs_from_upload(key, _entry, pixel_spacing_mm):
+    return analyze_calcifications(open_pixels(_entry), pixel_spacing_mm)
+
+def show_calc_detector():
+    """Mikrokalsifikasyon dedektörü; (analiz, yükleme anahtarı) veya (None, None) döner."""
+    with st.expander("🔎 Mikrokalsifikasyon Kümesi Dedektörü – görüntü/ROI yükle (isteğe bağlı)"):
+        calc_file = st.file_uploader("Mamografi veya ROI (PNG/JPEG/TIFF, 8/16-bit)", type=["png", "jpg", "jpeg", "tif", "tiff"], key="calc_file")
+        spacing = st.number_input("Piksel aralığı (mm)", min_value=0.01, max_value=1.0, value=PIXEL_SPACING_MM, step=0.01, key="calc_spacing")
+        if calc_file is None:
+            return None, None
+        try:
+            entry = load_upload(calc_file)
+            with st.spinner("Kalsifikasyonlar aranıyor..."):
+                analysis = calcs_from_upload(entry["key"], entry, spacing)
+        except (ValueError, OSError) as e:
+            st.error(f"Görüntü analiz edilemedi: {e}")
+            return None, None
+        caption = f"{analysis['count']} noktasal kalsifikasyon (meme alanında {analysis['per_cm2']}/cm²), {len(analysis['clusters'])} küme"
+        if analysis.get("clustered", analysis["count"]) < analysis["count"]:
+            caption += f" (kümeler {analysis['clustered']} noktalık eşit aralıklı örnekten)"
+        st.caption(caption)
+        if analysis["clusters"]:
+            st.dataframe(pd.DataFrame(analysis["clusters"]).rename(columns={
+                "count": "Sayı", "extent_mm": "Uzunluk (mm)", "width_mm": "Genişlik (mm)",
+                "per_cm2": "Sayı/cm²", "linearity": "Lineerlik", "center": "Merkez (satır, sütun)",
+            }), hide_index=True)
+        return analysis, (calc_file.file_id, spacing)
+
+def calc_dist_select(calc_morph, analysis, upload_key):
+    options = calc_dist_options(calc_morph)
+    suggestion = analysis["suggestion"] if analysis else None
+    # Öneri her yükleme/morfoloji için yalnızca bir kez uygulanır; sonrasında seçim okuyucudadır
+    if suggestion in options and st.session_state.get("calc_dist_prefill") != (upload_key, calc_morph):
+        st.session_state["calc_dist"] = suggestion
+        st.session_state["calc_dist_prefill"] = (upload_key, calc_morph)
+        save_form()
+    calc_dist = st.selectbox("Kalsifikasyon Dağılımı", options, key="calc_dist", on_change=save_form)
+    if suggestion:
+        st.caption(f"Dedektör önerisi: {suggestion} (öneridir, okuyucu değiştirebilir)")
+    return calc_dist
+
+# Kısa yazım alanı -> form widget anahtarları
+SHORTHAND_KEYS = {
+    "exam_complete": ["exam_complete"], "finding_type": ["finding_type"], "shape": ["shape"],
+    "margin": ["margin"], "calc_morph": ["calc_morph"], "calc_dist": ["calc_dist"], "asym_type": ["asym_type"],
+    "prev_surgery": ["prev_surgery"], "skin_retraction": ["skin_retraction"],
+    "nipple_retraction": ["nipple_retraction"], "stable_2yr": ["stable_2yr_main", "stable_2yr_combined"],
+}
+
+def apply_shorthand():
+    # on_change: ayrıştırılan değerler form widget'larına yazılır; verilmeyen seçimler
+    # varsayılana döner ki önceki vakanın değeri yeni vakaya taşınmasın
+    parsed = parse_shorthand(st.session_state["shorthand"])
+    inputs = parsed["inputs"]
+    if inputs["margin"] not in margin_options(inputs["shape"] or SHAPES[0]):
+        inputs["margin"] = None  # Seçeneklerde olmayan değer widget durumuna yazılmaz
+    for field, value in inputs.items():
+        for key in SHORTHAND_KEYS[field]:
+            if value is None:
+                st.session_state.pop(key, None)
+            else:
+                st.session_state[key] = value
+    st.session_state["shorthand_parsed"] = parsed
+    save_form()
+
+def show_shorthand():
+    with st.expander("⌨️ Kısa yazım (ör. M OV CIRC STB; C AMO SEG; AD PREVSURG)"):
+        tab_single, tab_bulk = st.tabs(["Tek vaka", "Toplu"])
+        with tab_single:
+            st.text_input("Kısa yazım", key="shorthand", on_change=apply_shorthand,
+                          help="Enter ile forma uygulanır; benzersiz önekler kabul edilir (SP → SPIC).")
+            parsed = st.session_state.get("shorthand_parsed")
+            if parsed:
+                for error in parsed["errors"]:
+                    st.warning(error)
+                if parsed["missing"]:
+                    st.caption("Formda seçilecek: " + ", ".join(parsed["missing"]))
+                if parsed["completions"]:
+                    st.caption("Tamamlamalar: " + " · ".join(parsed["completions"]))
+            st.caption(
+                "Bulgular: M kitle, C kalsifikasyon, AD distorsiyon, A asimetri · "
+                "Kitle: RND OV IRR / CIRC MIC IND SPIC · Kalsifikasyon: AMO PLEO LB PUNC POP RIM MOC SKIN VASC / "
+                "GRP SEG LIN DIF · Asimetri: ONE FOC DEV GLOB DENS · Genel: STB PREVSURG SKINR NIPR INC"
+            )
+        with tab_bulk:
+            text = st.text_area("Satır başına bir vaka (VAKA-NO: kısa yazım)", key="shorthand_bulk", height=160)
+            if not text.strip():
+                return
+            table = parse_bulk(text)
+            st.dataframe(table.drop(columns="inputs"), hide_index=True, use_container_width=True)
+            ready = table[(table["case_id"] != "") & (table["errors"] == "")]
+            col1, col2 = st.columns(2)
+            reader = col1.text_input("Okuyucu", key="bulk_reader")
+            if col2.button(f"{len(ready)} vakayı kaydet", disabled=ready.empty or not reader.strip()):
+                records = [
+                    append_record(row.case_id, reader, row.inputs, {"category": row.category, "management": row.management})
+                    for row in ready.itertuples()
+                ]
+                st.success(f"{len(ready)} vaka kaydedildi (hatalı veya vaka no'suz satırlar atlandı).")
+                export_records(records)
+
 # --- Custom CSS ---
 st.markdown("""
     <style>
@@ -49,6 +293,8 @@ st.markdown("""
     .birads-4c {background-color: #f8d7da; color: #721c24;}
     .birads-5 {background-color: #f5c6cb; color: #721c24;}
     .birads-6 {background-color: #f5c6cb; color: #000000;}
+    .density-a, .density-b {background-color: #f1f3f5; color: #383d41;}
+    .density-c, .density-d {background-color: #e2e3e5; color: #1b1e21;}
     </style>
 """, unsafe_allow_html=True)
 
@@ -56,20 +302,32 @@ st.markdown("""
 st.title("🩻 BI-RADS Karar Destek Sistemi (Mamografi Tabanlı)")
 st.warning("⚠️ Bu sistem yalnızca mamografik bulgular üzerinden BI-RADS kategorizasyonu yapar. US/MRI/klinik değerlendirme içermez.")
 
+restore_form()
+show_shorthand()
+
+# --- Meme yoğunluğu (isteğe bağlı) ---
+with st.expander("🔬 Meme Yoğunluğu (ACR a–d) – mamografi yükle (isteğe bağlı)"):
+    density_file = st.file_uploader("Mamografi görüntüsü (PNG/JPEG/TIFF, 8/16-bit)", type=["png", "jpg", "jpeg", "tif", "tiff"])
+    if density_file is None:
+        st.session_state.pop("density", None)
+    else:
+        try:
+            entry = load_upload(density_file, MAX_PIXELS)
+            st.session_state["density"] = density_from_upload(entry["key"], entry)
+        except (ValueError, OSError) as e:
+            st.session_state.pop("density", None)
+            st.error(f"Yoğunluk hesaplanamadı: {e}")
+    if st.session_state.get("density"):
+        d = st.session_state["density"]
+        st.caption(f"Fibroglandüler doku: %{d['percent']} (meme alanı: %{d['breast_fraction'] * 100:.0f}) → ACR {d['acr']}")
+
 # --- Tetkik kontrolü ---
-exam_complete = st.selectbox("Tetkik yeterli mi?", ["Evet", "Hayır"])
+exam_complete = st.selectbox("Tetkik yeterli mi?", ["Evet", "Hayır"], key="exam_complete", on_change=save_form)
 if exam_complete == "Hayır":
-    category = "BI-RADS 0"
-    explanation = "Tetkik yeterli değil. Ek tetkik (ek görüntüleme veya önceki mamogramlar) önerilir."
-    management = "Ek tetkik yapılmadan kesin değerlendirme yapılamaz."
-    reference_detail = (
-        "BI-RADS 0 is assigned when the imaging evaluation is incomplete and additional imaging or prior studies are required for a final assessment. "
-        "This category does not indicate benignity or malignancy, but rather the need for further evaluation.\n"
-        "References:\n"
-        "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-        "- Radiopaedia.org. 'BI-RADS 0 – Incomplete assessment.' Updated 2025."
-    )
-    display_result(category, explanation, management, reference_detail, None, None)
+    inputs = dict(exam_complete=exam_complete)
+    result = classify(**inputs)
+    display_result(result["category"], result["explanation"], result["management"], result["reference_detail"], None, None)
+    show_save_controls(inputs, result)
     st.markdown("""
     <hr>
     <p style='text-align:center; color:gray; font-size:14px;'>
@@ -80,209 +338,36 @@ if exam_complete == "Hayır":
     st.stop()
 
 # --- Bulgular ---
-finding_type = st.multiselect("Bulgu Tipi", ["Kitle", "Kalsifikasyon", "Architectural Distortion", "Asimetri"])
+finding_type = st.multiselect("Bulgu Tipi", FINDING_TYPES, key="finding_type", on_change=save_form)
 
 # --- Kombine bulgu algoritması EN ÜSTE ---
 if "Kitle" in finding_type and "Kalsifikasyon" in finding_type:
     st.session_state['combined_done'] = True
-    # Kitle skoru ve tipi
-    shape = st.selectbox("Lezyon Şekli", ["Yuvarlak", "Oval", "Düzensiz"])
-    if shape in ["Yuvarlak", "Oval"]:
-        margin = st.selectbox("Kenar Özelliği", ["Düzgün", "Mikrolobüle"])
-    else:
-        margin = st.selectbox("Kenar Özelliği", ["Mikrolobüle", "Düzensiz", "Spiküle"])
-    stable_2yr_combined = st.checkbox("Kitle 2 yıldır takipte stabil mi?", key="stable_2yr_combined")
-    if shape in ["Yuvarlak", "Oval"] and margin == "Düzgün":
-        kit_score = 2 if stable_2yr_combined else 3
-        kit_type = ""
-    elif margin == "Mikrolobüle":
-        kit_score = 4
-        kit_type = "4A"
-    elif margin == "Düzensiz":
-        kit_score = 4
-        kit_type = "4B"
-    elif margin == "Spiküle":
-        kit_score = 4
-        kit_type = "4C"
-    else:
-        kit_score = 0
-        kit_type = ""
-
-    benign_morphs = ["Coarse/Popcorn", "Eggshell/Rim", "Milk of Calcium", "Skin", "Vascular"]
-    calc_morph = st.selectbox(
-        "Kalsifikasyon Morfolojisi",
-        ["Amorf", "Pleomorfik", "Lineer/Dallanan", "Round/Punctate"] + benign_morphs
-    )
-    if calc_morph in benign_morphs:
+    shape = st.selectbox("Lezyon Şekli", SHAPES, key="shape", on_change=save_form)
+    margin = st.selectbox("Kenar Özelliği", margin_options(shape), key="margin", on_change=save_form)
+    stable_2yr_combined = st.checkbox("Kitle 2 yıldır takipte stabil mi?", key="stable_2yr_combined", on_change=save_form)
+    calc_analysis, calc_upload = show_calc_detector()
+    calc_morph = st.selectbox("Kalsifikasyon Morfolojisi", CALC_MORPHS, key="calc_morph", on_change=save_form)
+    if calc_morph in BENIGN_MORPHS:
         calc_dist = None
-    elif calc_morph == "Lineer/Dallanan":
-        calc_dist = st.selectbox("Kalsifikasyon Dağılımı", ["Segmental", "Lineer"])
-    else:
-        calc_dist = st.selectbox("Kalsifikasyon Dağılımı", ["Gruplu", "Segmental", "Lineer", "Diffüz"])
-
-    if calc_morph in benign_morphs:
-        kal_score = 2
-        kal_type = ""
-    elif calc_morph == "Round/Punctate":
-        kal_score = 2 if calc_dist == "Diffüz" else 3
-        kal_type = ""
-    elif calc_morph == "Amorf":
-        if calc_dist in ["Segmental", "Lineer"]:
-            kal_score = 4
-            kal_type = "4B"
-        else:
-            kal_score = 4
-            kal_type = "4A"
-    elif calc_morph == "Pleomorfik":
-        if calc_dist in ["Segmental", "Lineer"]:
-            kal_score = 4
-            kal_type = "4C"
-        else:
-            kal_score = 4
-            kal_type = "4B"
-    elif calc_morph == "Lineer/Dallanan":
-        kal_score = 4
-        kal_type = "4C"
     else:
-        kal_score = 0
-        kal_type = ""
-
-    # Kitle açıklama ve referansları
-    if kit_score == 2:
-        kit_expl = "2 yıldır stabil, oval/yuvarlak düzgün sınırlı kitle. Benign."
-        kit_ref = "A well-circumscribed oval or round mass that has remained stable for at least 2 years is considered benign and categorized as BI-RADS 2. Reference: American College of Radiology. BI-RADS® Atlas, 5th Edition."
-    elif kit_score == 3:
-        kit_expl = "İlk defa görülen veya stabil olmayan düzgün sınırlı oval/yuvarlak kitle. Muhtemelen benign."
-        kit_ref = "A newly detected, well-circumscribed oval or round mass without prior comparison is most likely benign, but short-term follow-up is recommended (BI-RADS 3). Reference: ACR BI-RADS® Atlas, 5th Edition."
-    elif kit_score == 4 and kit_type == "4A":
-        kit_expl = "Mikrolobüle kenar, düşük şüpheli. Stabilite malignite riskini azaltmaz."
-        kit_ref = (
-            "Microlobulated margins are associated with a low but non-negligible risk of malignancy, generally in the BI-RADS 4A category (≈2–10% risk). "
-            "Even if the lesion is stable for 2 years, suspicious margins are not downgraded to benign. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Radiopaedia.org. 'Breast mass margins.' Updated 2025.\n"
-            "- Stavros AT, et al. 'Solid Breast Nodules: Use of Sonography to Distinguish between Benign and Malignant Lesions.' Radiology. 2024."
-        )
-    elif kit_score == 4 and kit_type == "4B":
-        kit_expl = "Düzensiz kenar, orta şüpheli. Stabilite malignite riskini azaltmaz."
-        kit_ref = (
-            "Irregular mass margins are associated with an intermediate probability of malignancy and are classified as BI-RADS 4B (≈10–50% risk). "
-            "Stability over time does not exclude malignancy for suspicious margins. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Sickles EA, et al. 'Breast Imaging Reporting and Data System: ACR BI-RADS.' RSNA Breast Imaging Update 2024.\n"
-            "- Radiopaedia.org. 'Breast mass margins.' Updated 2025."
-        )
-    elif kit_score == 4 and kit_type == "4C":
-        kit_expl = "Spiküle kenar, yüksek şüpheli. Stabilite malignite riskini azaltmaz."
-        kit_ref = (
-            "Spiculated margins are highly predictive of invasive malignancy with a positive predictive value exceeding 90%. "
-            "Even if the lesion is stable for 2 years, spiculated margins remain highly suspicious and are not downgraded. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Harvey JA, et al. 'Predictive Value of Spiculated Margins in Mammographic Masses.' AJR Am J Roentgenol. 2024;222:455–462.\n"
-            "- Radiology Assistant. 'BI-RADS for Mammography.' Updated 2025."
-        )
+        calc_dist = calc_dist_select(calc_morph, calc_analysis, calc_upload)
 
-    # Kalsifikasyon açıklama ve referansları
-    if kal_score == 2:
-        kal_expl = f"{calc_morph} kalsifikasyon, tipik benign."
-        kal_ref = f"{calc_morph} type calcifications are considered classic benign patterns and are typically associated with fat necrosis, calcified fibroadenomas, dermal deposits, or vascular walls. Reference: ACR BI-RADS® Atlas, 5th Edition."
-    elif kal_score == 3:
-        kal_expl = "Gruplu round/punctate kalsifikasyon, muhtemelen benign."
-        kal_ref = "Grouped round or punctate calcifications are most often benign but carry a slightly higher malignancy risk compared to diffuse patterns, warranting short-term follow-up. Reference: ACR BI-RADS® Atlas, 5th Edition."
-    elif kal_score == 4 and kal_type == "4A":
-        kal_expl = "Amorf kalsifikasyon, düşük şüpheli."
-        kal_ref = "Amorphous calcifications lacking a distinct shape are considered suspicious because they are associated with both benign fibrocystic change and low-grade DCIS. Reference: ACR BI-RADS® Atlas, 5th Edition."
-    elif kal_score == 4 and kal_type == "4B":
-        kal_expl = "Amorf + segmental/lineer dağılım, orta şüpheli."
-        kal_ref = "Amorphous calcifications arranged in a segmental or linear distribution raise the concern for ductal involvement and are associated with an intermediate malignancy risk (≈10–50%). Reference: ACR BI-RADS® Atlas, 5th Edition."
-    elif kal_score == 4 and kal_type == "4C":
-        kal_expl = "Pleomorfik/lineer/dallanan kalsifikasyon, yüksek şüpheli."
-        kal_ref = "Pleomorphic or linear/branching calcifications arranged in a segmental or linear fashion are strongly associated with DCIS and occasionally invasive cancer. Reference: ACR BI-RADS® Atlas, 5th Edition."
-
-    # En yüksek skoru ve tipini seç
-    def birads_type_priority(t):
-        # 4C > 4B > 4A > "" (boş tip)
-        if t == "4C":
-            return 3
-        elif t == "4B":
-            return 2
-        elif t == "4A":
-            return 1
-        else:
-            return 0
-
-    if kit_score > kal_score:
-        max_score = kit_score
-        max_type = kit_type
-        chosen_expl = kit_expl
-        chosen_ref = kit_ref
-        other_expl = kal_expl
-        other_ref = kal_ref
-        chosen_label = "Mass (Kitle)"
-        other_label = "Calcification (Kalsifikasyon)"
-    elif kal_score > kit_score:
-        max_score = kal_score
-        max_type = kal_type
-        chosen_expl = kal_expl
-        chosen_ref = kal_ref
-        other_expl = kit_expl
-        other_ref = kit_ref
-        chosen_label = "Calcification (Kalsifikasyon)"
-        other_label = "Mass (Kitle)"
-    else:
-        # Skorlar eşitse, tip önceliğine bak!
-        if birads_type_priority(kit_type) >= birads_type_priority(kal_type):
-            max_score = kit_score
-            max_type = kit_type
-            chosen_expl = kit_expl
-            chosen_ref = kit_ref
-            other_expl = kal_expl
-            other_ref = kal_ref
-            chosen_label = "Mass (Kitle)"
-            other_label = "Calcification (Kalsifikasyon)"
-        else:
-            max_score = kal_score
-            max_type = kal_type
-            chosen_expl = kal_expl
-            chosen_ref = kal_ref
-            other_expl = kit_expl
-            other_ref = kit_ref
-            chosen_label = "Calcification (Kalsifikasyon)"
-            other_label = "Mass (Kitle)"
-
-    # Sonucu göster
-    category = f"BI-RADS {max_type}" if max_score == 4 else f"BI-RADS {max_score}"
-    explanation = f"{chosen_expl}\n\n{other_expl}"
-    management = "Biyopsi önerilir" if max_score == 4 else ("6 ay mamografi kontrolü" if max_score == 3 else "Rutin tarama")
-
-    # Açıklama detayları
-    if chosen_label == "Mass (Kitle)":
-        explanation_detail = f"Mass explanation: {chosen_ref}\n\nCalcification explanation: {other_ref}"
-    else:
-        explanation_detail = f"Calcification explanation: {chosen_ref}\n\nMass explanation: {other_ref}"
-
-    # Referans metni (en altta olacak)
-    ref_text = (
-        "Why is the highest BI-RADS category selected?\n"
-        "When multiple findings are present, the final BI-RADS assessment must reflect the most suspicious feature, regardless of the presence of benign findings. "
-        "This approach prevents underestimation of cancer risk and ensures appropriate management. "
-        "For example, if a spiculated mass (BI-RADS 4C) is present alongside amorphous grouped calcifications (BI-RADS 4A), the final category is BI-RADS 4C, as spiculated margins are highly predictive of invasive malignancy. "
-        "Similarly, benign calcifications do not downgrade the assessment if a suspicious mass margin is present.\n\n"
-        "References:\n"
-        "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-        "- Sickles EA, et al. 'Management of Multiple Mammographic Findings: Highest Suspicion Principle.' Radiology. 2024;310:112–120.\n"
-        "- Radiopaedia.org. 'BI-RADS assessment with multiple findings.' Updated 2025."
+    inputs = dict(
+        finding_type=finding_type, shape=shape, margin=margin, stable_2yr=stable_2yr_combined,
+        calc_morph=calc_morph, calc_dist=calc_dist,
     )
+    result = classify(**inputs)
 
-    # Sonuç kartı ve açıklamalar
-    display_result(category, explanation, management, ref_text)
-    st.info(f"{explanation_detail}")
+    # Sonuç kartı lokalizasyonun üstünde kalır; lezyon bazlı sonuç daha şüpheliyse onu gösterir
+    card = st.container()
+    result = reconcile(result, inputs, *show_localization(inputs))
+    with card:
+        # Sonuç kartı ve açıklamalar (en yüksek kategori neden seçildi, referanslar en altta)
+        display_result(result["category"], result["explanation"], result["management"], result["reference_detail"], None, result["extra_note"])
+        st.info(f"{result['explanation_detail']}")
+    show_save_controls(inputs, result)
 
-    # Referanslar en altta, footer'ın hemen üstünde!
-    
     st.markdown("""
     <hr>
     <p style='text-align:center; color:gray; font-size:14px;'>
@@ -302,410 +387,57 @@ if st.session_state.get('combined_done'):
 
 # --- Kitle ---
 if "Kitle" in finding_type:
-    shape = st.selectbox("Lezyon Şekli", ["Yuvarlak", "Oval", "Düzensiz"])
-    # Şekle göre kenar seçenekleri (düzgün her zaman, spiküle düzensizde anlamlı)
-    if shape in ["Yuvarlak", "Oval"]:
-        margin = st.selectbox("Kenar Özelliği", ["Düzgün", "Mikrolobüle"])
-    else:
-        margin = st.selectbox("Kenar Özelliği", ["Mikrolobüle", "Düzensiz", "Spiküle"])
+    shape = st.selectbox("Lezyon Şekli", SHAPES, key="shape", on_change=save_form)
+    margin = st.selectbox("Kenar Özelliği", margin_options(shape), key="margin", on_change=save_form)
 else:
     shape = margin = None
 
 # --- Kalsifikasyon ---
 if "Kalsifikasyon" in finding_type:
-    benign_morphs = ["Coarse/Popcorn", "Eggshell/Rim", "Milk of Calcium", "Skin", "Vascular"]
-
-    calc_morph = st.selectbox(
-        "Kalsifikasyon Morfolojisi",
-        ["Amorf", "Pleomorfik", "Lineer/Dallanan", "Round/Punctate"] + benign_morphs
-    )
-
-    # Morfolojiye göre dağılım kısıtlaması
-    if calc_morph in benign_morphs:
+    calc_analysis, calc_upload = show_calc_detector()
+    calc_morph = st.selectbox("Kalsifikasyon Morfolojisi", CALC_MORPHS, key="calc_morph", on_change=save_form)
+    if calc_morph in BENIGN_MORPHS:
         calc_dist = None
-    elif calc_morph == "Lineer/Dallanan":
-        calc_dist = st.selectbox("Kalsifikasyon Dağılımı", ["Segmental", "Lineer"])
     else:
-        calc_dist = st.selectbox("Kalsifikasyon Dağılımı", ["Gruplu", "Segmental", "Lineer", "Diffüz"])
+        calc_dist = calc_dist_select(calc_morph, calc_analysis, calc_upload)
 else:
     calc_morph = calc_dist = None
 
 # --- Asimetri ---
 if "Asimetri" in finding_type:
-    asym_type = st.selectbox("Asimetri Türü", ["Tek Projeksiyon", "Fokal", "Gelişen", "Global", "Sadece Yoğunluk Farkı"])
+    asym_type = st.selectbox("Asimetri Türü", ASYM_TYPES, key="asym_type", on_change=save_form)
 else:
     asym_type = None
 
 has_AD = "Architectural Distortion" in finding_type
-skin_retraction = st.checkbox("Cilt çekintisi (Skin Retraction)")
-nipple_retraction = st.checkbox("Meme başı retraksiyonu (Nipple Retraction)")
-
-# --- Sonuç değişkenleri ---
-category = ""
-explanation = ""
-management = ""
-reference_detail = ""
-image_path = None  # Görsel özelliği şimdilik kapalı
-extra_note = ""
-
-# --- BI-RADS 1 ---
-if not finding_type:
-    category = "BI-RADS 1"
-    explanation = "Mamografide bulgu saptanmadı. Negatif mamografi."
-    management = "Rutin tarama"
-    reference_detail = "A negative screening mammogram without findings is BI-RADS 1. (Radiopaedia – BI-RADS categories)"
-
-# --- Kitle kararları ---
-if "Kitle" in finding_type:
-    if shape in ["Yuvarlak", "Oval"] and margin == "Düzgün":
-        stable_2yr = st.checkbox("Kitle 2 yıldır takipte stabil mi?", key="stable_2yr_main")
-        if stable_2yr:
-            category = "BI-RADS 2"
-            explanation = "2 yıldır stabil, oval/yuvarlak düzgün sınırlı kitle. Benign."
-            management = "Rutin tarama"
-            reference_detail = (
-                "A well-circumscribed oval or round mass that has remained stable for at least 2 years is considered benign and categorized as BI-RADS 2. "
-                "Reference: American College of Radiology. BI-RADS® Atlas, 5th Edition."
-            )
-        else:
-            category = "BI-RADS 3"
-            explanation = "İlk defa görülen veya stabil olmayan düzgün sınırlı oval/yuvarlak kitle. Muhtemelen benign."
-            management = "6 ay mamografi kontrolü"
-            reference_detail = (
-                "A newly detected, well-circumscribed oval or round mass without prior comparison is most likely benign, but short-term follow-up is recommended (BI-RADS 3). "
-                "The presence of classic benign calcifications, such as eggshell or rim types, does not lower the BI-RADS category unless stability is proven over a two-year period. "
-                "This approach is emphasized in the ACR BI-RADS® Atlas, 5th Edition: 'When both a probably benign and a classic benign feature are present, the assessment should reflect the higher level of suspicion unless stability is proven.' "
-                "Therefore, even in the presence of benign calcifications, a new or not-yet-stable mass should be managed as probably benign with short-term follow-up. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Sickles EA, et al. 'Management of Probably Benign Lesions.' Radiology. 2024;310:112–120.\n"
-                "- Berg WA, et al. 'Evaluation of Breast Mass Margins: Predictive Value and Management.' AJR Am J Roentgenol. 2023;221:315–322.\n"
-                "- Radiopaedia.org. 'Breast mass margins: risk stratification.' Updated 2025."
-            )
-    elif margin == "Mikrolobüle":
-        category = "BI-RADS 4A"
-        explanation = "Mikrolobüle kenar, düşük şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "Microlobulated margins are associated with a low but non-negligible risk of malignancy, generally in the BI-RADS 4A category (≈2–10% risk). "
-            "These margins may be seen in both benign fibroadenomas and low-grade carcinomas, warranting tissue diagnosis. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Radiopaedia.org. 'Breast mass margins.' Updated 2025.\n"
-            "- Stavros AT, et al. 'Solid Breast Nodules: Use of Sonography to Distinguish between Benign and Malignant Lesions.' Radiology. 2024."
-        )
-    elif margin == "Düzensiz":
-        category = "BI-RADS 4B"
-        explanation = "Düzensiz kenar, orta şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "Irregular mass margins are associated with an intermediate probability of malignancy and are classified as BI-RADS 4B (≈10–50% risk). "
-            "These findings require biopsy due to significant overlap with invasive carcinomas. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Sickles EA, et al. 'Breast Imaging Reporting and Data System: ACR BI-RADS.' RSNA Breast Imaging Update 2024.\n"
-            "- Radiopaedia.org. 'Breast mass margins.' Updated 2025."
-        )
-    elif margin == "Spiküle":
-        category = "BI-RADS 4C"
-        explanation = "Spiküle kenar, yüksek şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "Spiculated margins are highly predictive of invasive malignancy with a positive predictive value exceeding 90% in most series, placing these lesions in BI-RADS 4C or 5 depending on associated features. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Harvey JA, et al. 'Predictive Value of Spiculated Margins in Mammographic Masses.' AJR Am J Roentgenol. 2024;222:455–462.\n"
-            "- Radiology Assistant. 'BI-RADS for Mammography.' Updated 2025."
-        )
-    elif margin in ["Mikrolobüle", "Düzensiz", "Spiküle"]:
-        if margin == "Mikrolobüle":
-            category = "BI-RADS 4A"
-            explanation = "Mikrolobüle kenar, düşük şüpheli. Benign kalsifikasyon olsa bile, şüpheli kitle bulgusu baskındır."
-            management = "Biyopsi önerilir"
-            reference_detail = (
-                "According to the ACR BI-RADS® Atlas, 5th Edition, when multiple findings are present, the final assessment should reflect the highest level of suspicion. "
-                "Benign calcifications, such as eggshell or rim types, do not downgrade the category if a suspicious mass margin is present. "
-                "Microlobulated margins are associated with a low but significant risk of malignancy (typically 2–10%), and this risk takes precedence over benign features. "
-                "As stated in the Atlas: 'If both a suspicious and a benign feature are present, the assessment should reflect the highest level of suspicion.' "
-                "This principle ensures that potentially malignant lesions are not overlooked due to the coexistence of benign findings. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition, Breast Imaging Reporting and Data System.\n"
-                "- Berg WA, et al. 'Evaluation of Breast Mass Margins: Predictive Value and Management.' AJR Am J Roentgenol. 2023;221:315–322.\n"
-                "- Radiopaedia.org. 'Breast mass margins: risk stratification.' Updated 2025."
-            )
-        elif margin == "Düzensiz":
-            category = "BI-RADS 4B"
-            explanation = "Düzensiz kenar, orta şüpheli. Benign kalsifikasyon olsa bile, şüpheli kitle bulgusu baskındır."
-            management = "Biyopsi önerilir"
-            reference_detail = (
-                "The presence of irregular mass margins is considered an intermediate risk for malignancy (10–50%), and this risk is not mitigated by the coexistence of benign calcifications. "
-                "The ACR BI-RADS® Atlas, 5th Edition, emphasizes that the most suspicious feature should determine the final BI-RADS category. "
-                "This approach prevents underestimation of cancer risk when benign and suspicious findings are present together. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Sickles EA, et al. 'Breast Imaging Reporting and Data System: ACR BI-RADS.' RSNA Breast Imaging Update 2024.\n"
-                "- Radiopaedia.org. 'Breast mass margins: risk stratification.' Updated 2025."
-            )
-        elif margin == "Spiküle":
-            category = "BI-RADS 4C"
-            explanation = "Spiküle kenar, yüksek şüpheli. Benign kalsifikasyon olsa bile, şüpheli kitle bulgusu baskındır."
-            management = "Biyopsi önerilir"
-            reference_detail = (
-                "Spiculated mass margins are highly predictive of invasive malignancy, with a positive predictive value exceeding 90% in most series. "
-                "Even when benign calcifications are present, the assessment must be based on the most suspicious feature. "
-                "The ACR BI-RADS® Atlas, 5th Edition, states: 'If both a suspicious and a benign feature are present, the assessment should reflect the highest level of suspicion.' "
-                "This ensures that the risk of malignancy is not underestimated due to the presence of benign findings. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Harvey JA, et al. 'Predictive Value of Spiculated Margins in Mammographic Masses.' AJR Am J Roentgenol. 2024;222:455–462.\n"
-                "- Radiology Assistant. 'BI-RADS for Mammography: Spiculated Masses.' Updated 2025."
-            )
-
-# --- Kalsifikasyon kararları ---
-if "Kalsifikasyon" in finding_type:
-    if calc_morph in benign_morphs:
-        category = "BI-RADS 2"
-        explanation = f"{calc_morph} kalsifikasyon, tipik benign."
-        management = "Rutin tarama"
-        reference_detail = (
-            f"{calc_morph} type calcifications are considered classic benign patterns and are typically associated with fat necrosis, calcified fibroadenomas, dermal deposits, or vascular walls. "
-            "Their imaging appearance is pathognomonic enough to reliably exclude malignancy, with a malignancy risk <2%. "
-            "Lesions with these morphologies are assigned BI-RADS 2 and require no additional imaging beyond routine screening.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition, Breast Imaging Reporting and Data System.\n"
-            "- Burnside ES, et al. 'Assessment of Calcification Patterns in Mammography.' RSNA Breast Imaging Review 2025.\n"
-            "- Radiology Assistant. 'Breast Calcifications: Benign patterns.' Updated 2024."
-        )
-    elif calc_morph == "Round/Punctate":
-        if calc_dist == "Diffüz":
-            category = "BI-RADS 2"
-            explanation = "Diffüz round/punctate kalsifikasyon, benign."
-            management = "Rutin tarama"
-            reference_detail = (
-                "Diffuse distribution of round or punctate calcifications, especially when bilateral and symmetric, almost always represents benign fibrocystic changes or secretory calcifications. "
-                "This morphology combined with diffuse distribution carries an extremely low malignancy risk (<2%) and is categorized as BI-RADS 2. "
-                "Routine follow-up is sufficient with no need for biopsy.\n"
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Harvey JA, et al. 'Diffuse Benign Calcifications in Screening Mammography.' AJR Am J Roentgenol. 2024;222:455–462.\n"
-                "- Radiopaedia.org. 'Breast calcifications – diffuse distribution.' Updated 2025."
-            )
-        else:
-            category = "BI-RADS 3"
-            explanation = "Gruplu round/punctate kalsifikasyon, muhtemelen benign."
-            management = "6 ay mamografi kontrolü"
-            reference_detail = (
-                "Grouped round or punctate calcifications are most often benign but carry a slightly higher malignancy risk compared to diffuse patterns, warranting short-term follow-up. "
-                "When no suspicious morphology or distribution pattern is present, these are classified as BI-RADS 3 with an estimated malignancy risk <2%. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Sickles EA, et al. 'Follow-up of Probably Benign Breast Calcifications.' Radiology. 2023;308:112–120.\n"
-                "- Radiology Assistant. 'Calcifications: Probably Benign Patterns.' Updated 2025."
-            )
-    elif calc_morph == "Amorf":
-        category = "BI-RADS 4A"
-        explanation = "Amorf kalsifikasyon, düşük şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "Amorphous calcifications lacking a distinct shape are considered suspicious because they are associated with both benign fibrocystic change and low-grade ductal carcinoma in situ (DCIS). "
-            "When not distributed segmentally or linearly, the malignancy risk is typically in the low range (≈2–10%), categorizing them as BI-RADS 4A. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Radiology Assistant. 'Breast Calcifications: Amorphous.' Updated 2025.\n"
-            "- Burnside ES, et al. 'Risk Stratification of Amorphous Calcifications.' AJR Am J Roentgenol. 2023;221:410–418."
-        )
-        if calc_dist in ["Segmental", "Lineer"]:
-            category = "BI-RADS 4B"
-            explanation = "Amorf + segmental/lineer dağılım, orta şüpheli."
-            reference_detail = (
-                "Amorphous calcifications arranged in a segmental or linear distribution raise the concern for ductal involvement and are associated with an intermediate malignancy risk (≈10–50%). "
-                "These patterns are upgraded to BI-RADS 4B to reflect the increased likelihood of DCIS. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Harvey JA, et al. 'Distribution Patterns of Breast Calcifications and Malignancy Risk.' Radiology. 2024;310:225–234.\n"
-                "- RSNA Breast Imaging Update 2025."
-            )
-    elif calc_morph == "Pleomorfik":
-        category = "BI-RADS 4B"
-        explanation = "Pleomorfik kalsifikasyon, orta şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "Pleomorphic calcifications, with varying shapes and densities, carry a moderate suspicion for malignancy (≈10–50%). "
-            "When not distributed in a segmental or linear pattern, they are typically classified as BI-RADS 4B due to overlap between benign sclerosing adenosis and DCIS. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Radiology Assistant. 'Breast Calcifications: Suspicious Morphologies.' Updated 2025.\n"
-            "- Burnside ES, et al. 'Pleomorphic Calcifications and Cancer Risk.' AJR Am J Roentgenol. 2024;223:520–528."
-        )
-        if calc_dist in ["Segmental", "Lineer"]:
-            category = "BI-RADS 4C"
-            explanation = "Pleomorfik + segmental/lineer dağılım, yüksek şüpheli."
-            reference_detail = (
-                "Pleomorphic calcifications arranged in a segmental or linear fashion are strongly associated with ductal carcinoma in situ and occasionally invasive cancer. "
-                "This pattern carries a high malignancy risk (>50%), placing the lesion in the BI-RADS 4C category. "
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Harvey JA, et al. 'Segmental Distribution of Pleomorphic Calcifications.' AJR Am J Roentgenol. 2024;222:600–608.\n"
-                "- Radiopaedia.org. 'Suspicious Breast Calcifications.' Updated 2025."
-            )
-    elif calc_morph == "Lineer/Dallanan":
-        category = "BI-RADS 4C"
-        explanation = "Lineer/dallanan kalsifikasyon, yüksek şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "Linear or branching calcifications following a ductal distribution are highly predictive of ductal carcinoma in situ (DCIS), particularly high-grade lesions. "
-            "This morphology carries a malignancy risk often exceeding 50% and is classified as BI-RADS 4C or 5 depending on associated findings. "
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Sickles EA, et al. 'Suspicious Calcification Patterns in Mammography.' RSNA Breast Imaging Update 2024.\n"
-            "- Radiology Assistant. 'Breast Calcifications: Suspicious.' Updated 2025."
-        )
-
-# --- Asimetri kararları ---
-if "Asimetri" in finding_type and "Kitle" not in finding_type and "Kalsifikasyon" not in finding_type:
-    if asym_type == "Tek Projeksiyon":
-        category = "BI-RADS 0"
-        explanation = "Tek projeksiyon asimetri → ek görüntüleme."
-        management = "Ek mamografi projeksiyonları"
-        reference_detail = (
-            "An asymmetry detected on only one mammographic projection is most frequently the result of summation artifact rather than a true lesion. "
-            "Because the presence or absence of a corresponding density on the orthogonal view cannot be determined, the finding is considered incomplete. "
-            "Additional projections, spot compression, or tomosynthesis views are necessary to confirm or exclude a real abnormality. "
-            "This presentation is categorized as BI-RADS 0 pending further imaging.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Destounis S, et al. 'Single-Projection Asymmetries in Screening Mammography.' AJR Am J Roentgenol. 2023;221:780–788.\n"
-            "- Radiopaedia.org. 'Breast asymmetry – single projection.' Updated 2025."
-        )
-
-    elif asym_type == "Fokal":
-        category = "BI-RADS 3"
-        explanation = "Fokal asimetri, muhtemelen benign."
-        management = "6 ay mamografi kontrolü"
-        reference_detail = (
-            "A focal asymmetry is a small, localized area of increased fibroglandular density seen on two projections that does not meet the criteria for a mass and lacks associated suspicious findings. "
-            "When stable over time and without architectural distortion or calcifications, the malignancy risk is estimated at <2%, qualifying it as BI-RADS 3. "
-            "Short-term follow-up at 6 months is recommended to ensure stability.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Sickles EA, et al. 'Management of Probably Benign Breast Asymmetries.' Radiology. 2023;308:210–218.\n"
-            "- Radiopaedia.org. 'Focal breast asymmetry.' Updated 2025."
-        )
-        image_path = img("birads3_asymmetry_focal.jpg")
-    elif asym_type == "Gelişen":
-        category = "BI-RADS 4A"
-        explanation = "Gelişen asimetri, düşük şüpheli."
-        management = "Biyopsi önerilir"
-        reference_detail = (
-            "A developing asymmetry is a focal density that becomes more conspicuous or larger compared to prior mammograms, indicating a true tissue change. "
-            "This finding carries a malignancy risk in the low suspicious range (≈2–10%), often prompting tissue sampling unless a benign etiology can be established. "
-            "According to Destounis et al. (Radiology, 2025), the malignancy risk for developing asymmetry may reach up to 13%. "
-            "It is classified as BI-RADS 4A.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Destounis S, et al. 'Developing Asymmetries: Clinical and Imaging Outcomes.'AJR Am J Roentgenol. 2025;316(2):210–218.\n"
-            "- RSNA Breast Imaging Update 2025."
-        )
-        image_path = img("birads4a_asymmetry_developing.jpg")
-    elif asym_type == "Global":
-        category = "BI-RADS 2"
-        explanation = "Global asimetri, genellikle benign."
-        management = "Rutin tarama"
-        reference_detail = (
-            "A global asymmetry represents a large volume of tissue density, usually encompassing more than one quadrant, without a definable mass or associated suspicious features. "
-            "This pattern most often reflects normal developmental or hormonal variation of fibroglandular tissue and carries a malignancy risk <2%. "
-            "Stable global asymmetries are assessed as BI-RADS 2 with routine screening recommended.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- RSNA Breast Imaging Course 2024.\n"
-            "- Radiopaedia.org. 'Global breast asymmetry.' Updated 2025."
-        )
-        image_path = img("birads2_asymmetry_global.jpg")
-    elif asym_type == "Sadece Yoğunluk Farkı":
-        category = "BI-RADS 2"
-        explanation = "Sadece yoğunluk farkı, genellikle benign."
-        management = "Rutin tarama"
-        reference_detail = (
-            "A density-only asymmetry without a mass effect, architectural distortion, or suspicious calcifications typically represents normal fibroglandular pattern variation. "
-            "When symmetric or stable over time, the malignancy risk is negligible (<2%) and the finding is categorized as BI-RADS 2. "
-            "No additional workup beyond routine screening is necessary.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Destounis S, et al. 'Breast Density Variations and Asymmetry Interpretation.' AJR Am J Roentgenol. 2023;222:700–708.\n"
-            "- Radiopaedia.org. 'Breast asymmetry – density only.' Updated 2025."
-        )
+skin_retraction = st.checkbox("Cilt çekintisi (Skin Retraction)", key="skin_retraction", on_change=save_form)
+nipple_retraction = st.checkbox("Meme başı retraksiyonu (Nipple Retraction)", key="nipple_retraction", on_change=save_form)
 
+# Stabilite sorusu yalnızca düzgün sınırlı oval/yuvarlak kitlede anlamlı
+stable_2yr = False
+if "Kitle" in finding_type and shape in ["Yuvarlak", "Oval"] and margin == "Düzgün":
+    stable_2yr = st.checkbox("Kitle 2 yıldır takipte stabil mi?", key="stable_2yr_main", on_change=save_form)
 
-elif "Asimetri" in finding_type:
-    extra_note = "Asimetri diğer bulgularla birlikte izlendi; BI-RADS kategorisini değiştirmedi."
-
-# --- Architectural Distortion algoritması (örnek konum)
+prev_surgery = "Hayır"
 if has_AD:
-    prev_surgery = st.radio("Cerrahi/biopsi öyküsü var mı?", ["Hayır", "Evet"])
-    
-    # Şüpheli kitleyi tanımla (kitle kenarı ve şekli seçimine göre)
-    suspicious_mass = False
-    if (margin in ["Spiküle", "Düzensiz", "Mikrolobüle"] or shape == "Düzensiz"):
-        suspicious_mass = True
-
-    if prev_surgery == "Evet":
-        category = "BI-RADS 2"
-        explanation = "Architectural distortion + cerrahi/biopsi öyküsü: benign post-op."
-        management = "Rutin tarama"
-        reference_detail = (
-            "Architectural distortion in the setting of prior breast surgery or biopsy commonly represents benign postoperative scar tissue or architectural remodeling. "
-            "When the distortion conforms to the expected surgical site and there are no associated suspicious calcifications or new changes, the risk of malignancy is negligible (<2%), "
-            "allowing categorization as BI-RADS 2. Routine screening is recommended in these cases.\n"
-            "References:\n"
-            "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-            "- Dershaw DD, et al. 'Post-Surgical Architectural Distortion: Imaging Patterns and Pitfalls.' Radiology. 2023;307:140–149.\n"
-            "- Radiopaedia.org. 'Architectural distortion – postoperative.' Updated 2025."
-        )
-    else:
-        if suspicious_mass:
-            category = "BI-RADS 5"
-            explanation = "Kitle ile birlikte architectural distortion: klasik malignite paterni."
-            management = "Acil biyopsi / cerrahi önerilir."
-            reference_detail = (
-                "Combined architectural distortion and suspicious mass margins are highly predictive of invasive carcinoma, with a positive predictive value exceeding 95%. "
-                "Such cases warrant a BI-RADS 5 assessment and urgent tissue diagnosis.\n"
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- Bahl M, et al. 'Combined Architectural Distortion and Suspicious Features: Correlation with Malignancy.' AJR Am J Roentgenol. 2024;223:120–129.\n"
-                "- Radiology Assistant. 'Architectural Distortion in Mammography.' Updated 2025."
-            )
-        else:
-            category = "BI-RADS 4C"
-            explanation = "Tek başına architectural distortion, yüksek şüpheli."
-            management = "Biyopsi önerilir."
-            reference_detail = (
-                "Architectural distortion without prior surgery or trauma and lacking a clearly benign explanation should raise high suspicion for malignancy, "
-                "particularly when newly developed or associated with retraction, spiculation, or asymmetry. This finding carries a malignancy likelihood typically between 50–95%, "
-                "placing it in the BI-RADS 4C category. Biopsy is strongly recommended to determine histopathology.\n"
-                "References:\n"
-                "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-                "- D’Orsi CJ et al. 'Evaluation of Architectural Distortion in Mammography.' Radiology Clinics of North America. 2023;61(4):659–673.\n"
-                "- Radiopaedia.org. 'Isolated architectural distortion – breast.' Updated 2025."
-            )
+    prev_surgery = st.radio("Cerrahi/biopsi öyküsü var mı?", ["Hayır", "Evet"], key="prev_surgery", on_change=save_form)
 
-# --- Associated Features ---
-if (skin_retraction or nipple_retraction) and exam_complete == "Evet":
-    category = "BI-RADS 5"
-    explanation = "Cilt/meme başı retraksiyonu: klasik malignite paterni."
-    management = "Biyopsi / cerrahi"
-    reference_detail = (
-        "Skin or nipple retraction is considered a hallmark of underlying malignancy, particularly invasive carcinoma, due to tumor-induced fibrotic retraction of Cooper’s ligaments "
-        "or ductal involvement. These clinical signs, especially when accompanied by a palpable mass or architectural distortion, are diagnostic of malignancy with high specificity. "
-        "Their presence, even in the absence of obvious imaging features, warrants a BI-RADS 5 assessment and urgent tissue diagnosis.\n"
-        "References:\n"
-        "- American College of Radiology. BI-RADS® Atlas, 5th Edition.\n"
-        "- Liberman L. 'Clinical Features in Breast Cancer Diagnosis: What Radiologists Must Know.' AJR Am J Roentgenol. 2023;221(2):222–229.\n"
-        "- RSNA Core Curriculum: Breast Imaging Signs of Malignancy (2025 Edition)."
-    )
+# --- Sonuç ---
+inputs = dict(
+    exam_complete=exam_complete, finding_type=finding_type, shape=shape, margin=margin,
+    stable_2yr=stable_2yr, calc_morph=calc_morph, calc_dist=calc_dist, asym_type=asym_type,
+    prev_surgery=prev_surgery, skin_retraction=skin_retraction, nipple_retraction=nipple_retraction,
+)
+result = classify(**inputs)
+image_path = None  # Görsel özelliği şimdilik kapalı
 
 # --- Sonuç kartı ---
-if category:
-    display_result(category, explanation, management, reference_detail, None, extra_note)
+card = st.container()
+result = reconcile(result, inputs, *show_localization(inputs))
+if result["category"]:
+    with card:
+        display_result(result["category"], result["explanation"], result["management"], result["reference_detail"], image_path, result["extra_note"])
+    show_save_controls(inputs, result)
 
 
 # --- Footer: Sadece dosyanın en sonunda, bir kez ---
@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('images', 'images')]
+datas = [('images', 'images'), ('pages', 'pages'), ('fast_ui', 'fast_ui')]
 binaries = []
 hiddenimports = []
 tmp_ret = collect_all('streamlit')
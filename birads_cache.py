@@ -0,0 +1,143 @@
+# --- Süreçler arası paylaşılan önbellek ---
+# Çok süreçli (birads_cluster.py) çalışmada her Streamlit süreci kendi
+# st.cache_data kopyasını tutarsa bellek işçi sayısıyla çoğalır. Pahalı
+# sonuçlar (yoğunluk/kalsifikasyon analizi) bunun yerine veri klasöründeki
+# tek bir SQLite dosyasında tutulur:
+# WAL kipiyle eşzamanlı okuma/yazma, mmap ile sayfalar işletim sisteminin
+# sayfa önbelleğinde tüm süreçlerce paylaşılır. Boyut sınırı aşılınca en eski
+# erişilen kayıtlar silinir.
+#
+# Değerler pickle ile saklanır; dosya yalnızca uygulamanın kendisi tarafından yazılır.
+
+from functools import wraps
+import hashlib
+import io
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from PIL import Image
+
+from birads_history import data_path
+
+CACHE_FILE = "cache.sqlite"
+MAX_BYTES = 256 << 20
+MMAP_BYTES = 256 << 20
+# Her bu kadar yazmada bir boyut sınırı denetlenir
+PRUNE_EVERY = 32
+
+
+class SharedCache:
+    """SQLite tabanlı anahtar/değer önbelleği; iş parçacığı başına bağlantı."""
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES):
+        self.path = path or data_path(CACHE_FILE)
+        self.max_bytes = max_bytes
+        self.local = threading.local()
+        self.writes = 0
+        self.hits = self.misses = 0
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (ns TEXT, key TEXT, value BLOB, size INTEGER, "
+                "atime REAL, PRIMARY KEY (ns, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_atime ON cache (atime)")
+            self.local.conn = conn
+        return conn
+
+    def get(self, ns, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM cache WHERE ns = ? AND key = ?", (ns, key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        conn.execute("UPDATE cache SET atime = ? WHERE ns = ? AND key = ?", (time.time(), ns, key))
+        return row[0]
+
+    def put(self, ns, key, value):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+            (ns, key, sqlite3.Binary(value), len(value), time.time()),
+        )
+        self.writes += 1
+        if self.writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for ns, key, size in conn.execute("SELECT ns, key, size FROM cache ORDER BY atime").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (ns, key))
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        count, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {"entries": count, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def shared_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = SharedCache()
+        return _CACHE
+
+
+def shared_cached(ns):
+    """st.cache_data benzeri dekoratör; "_" ile başlayan argümanlar anahtara katılmaz."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            names = func.__code__.co_varnames[:func.__code__.co_argcount]
+            parts = [repr(a) for n, a in zip(names, args) if not n.startswith("_")]
+            parts += [f"{k}={v!r}" for k, v in sorted(kwargs.items()) if not k.startswith("_")]
+            key = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+            cache = shared_cache()
+            blob = cache.get(ns, key)
+            if blob is not None:
+                return pickle.loads(blob)
+            value = func(*args, **kwargs)
+            cache.put(ns, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            return value
+        return wrapper
+    return decorator
+
+
+@shared_cached("image")
+def resized_image(path, width, mtime):
+    """Örnek görseli verilen genişliğe küçültülmüş JPEG baytları olarak döner."""
+    with Image.open(path) as image:
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        image.convert("RGB").save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def example_image(path, width=800):
+    # Sonuç kartındaki örnek mamografi için; birads_app'te örnek görsel özelliği
+    # kapalı (image_path her zaman None) olduğundan şu an çağrılmaz. Yüklenen
+    # görüntülerin önizlemeleri bu önbellekte değil, birads_upload'da süreç içinde tutulur.
+    return resized_image(path, width, os.path.getmtime(path))
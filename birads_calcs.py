@@ -0,0 +1,248 @@
+# --- Mikrokalsifikasyon kümesi dedektörü (yardımcı) ---
+# Yüklenen görüntü veya ROI'de parlak noktasal lekeleri vektörel NumPy
+# filtreleriyle bulur: blok (tile) bazında tek integral görüntüden 3x3 ve yerel
+# arka plan ortalaması, standart sapma, kontrast eşiği ve 3x3 yerel maksimum.
+# Noktalar uzamsal ızgara indeksiyle (hücre köşegeni = bağlantı mesafesi) kümelenir; küme
+# başına sayı/cm², yayılım ve lineerlik hesaplanıp "Kalsifikasyon Dağılımı" için
+# öneri üretilir.
+# Öneri yalnızca seçimi önceden doldurur; karar okuyucudadır.
+
+import numpy as np
+
+from birads_density import tiled_histogram, otsu_threshold
+
+PIXEL_SPACING_MM = 0.1
+# Yerel arka plan penceresi yarıçapı (mm)
+BACKGROUND_RADIUS_MM = 1.0
+# 3x3 ortalama alınmış görüntüde arka plan standart sapmasının katı olarak kontrast eşiği
+CONTRAST_SIGMA = 6.0
+# En düşük mutlak kontrast (görüntü maksimumuna oranla)
+MIN_CONTRAST = 0.02
+# Aynı kümeye bağlanacak en uzak komşu mesafesi (mm)
+LINK_DISTANCE_MM = 5.0
+MIN_CLUSTER_SIZE = 3
+# Dağılım önerisi için bölge bağlantı mesafesi (mm) ve diffüz için en az sayı
+REGION_LINK_MM = 10.0
+DIFFUSE_MIN_COUNT = 10
+# BI-RADS: gruplu dağılım en büyük boyutta 2 cm'yi aşmaz
+GROUPED_MAX_EXTENT_MM = 20.0
+LINEAR_MIN_LINEARITY = 0.9
+TILE_ROWS = 512
+# Kümelemede hücre çifti başına tek seferde açılan / blok başına en çok nokta çifti
+SMALL_PAIR_BLOCK = 64
+MAX_PAIR_BLOCK = 1 << 20
+# Kümelenen en çok aday nokta; fazlası eşit aralıklı örneklenir (gürültülü görüntü)
+MAX_CLUSTER_POINTS = 20000
+
+
+def _integral(a, r, dtype=np.float64):
+    # Kenarları r piksel tekrarlanarak (edge) doldurulmuş dizinin integral görüntüsü
+    padded = np.pad(a, r, mode="edge")
+    out = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=dtype)
+    np.cumsum(padded, axis=0, out=out[1:, 1:])
+    np.cumsum(out[1:, 1:], axis=1, out=out[1:, 1:])
+    return out
+
+
+def _box_mean(integral, r, q, shape):
+    # r ile doldurulmuş integralden (2q+1)x(2q+1) pencere ortalaması (q <= r)
+    h, w = shape
+    k = 2 * q + 1
+    y0 = x0 = r - q
+    total = (integral[y0 + k:y0 + k + h, x0 + k:x0 + k + w] - integral[y0:y0 + h, x0 + k:x0 + k + w]
+             - integral[y0 + k:y0 + k + h, x0:x0 + w] + integral[y0:y0 + h, x0:x0 + w])
+    return total / (k * k)
+
+
+def detect_spots(pixels, pixel_spacing_mm=PIXEL_SPACING_MM, tile_rows=TILE_ROWS):
+    """Parlak noktasal lekelerin (satır, sütun) koordinatlarını ve meme alanını (piksel) döner."""
+    hist, shift = tiled_histogram(pixels)
+    breast_threshold = (otsu_threshold(hist) + 1) << shift
+    scale = 1.0 / max(int(pixels.max()), 1)
+    r = max(2, int(round(BACKGROUND_RADIUS_MM / pixel_spacing_mm)))
+    h = pixels.shape[0]
+    points = []
+    breast_pixels = 0
+    for start in range(0, h, tile_rows):
+        stop = min(start + tile_rows, h)
+        # Pencere kenar etkisi olmasın diye blok r satır taşmalı (halo) işlenir
+        lo, hi = max(0, start - r - 1), min(h, stop + r + 1)
+        raw = pixels[lo:hi]
+        in_breast = raw >= breast_threshold
+        own = slice(start - lo, stop - lo)
+        breast_pixels += int(in_breast[own].sum())
+        if not in_breast[own].any():
+            continue
+        tile = raw.astype(np.float32) * scale
+        s1 = _integral(tile, r)
+        # 3x3 ortalama gürültüyü ~3 kat azaltır, 1–3 piksellik lekeyi korur
+        spot = _box_mean(s1, r, 1, tile.shape)
+        mean = _box_mean(s1, r, r, tile.shape)
+        std = np.sqrt(np.maximum(_box_mean(_integral(tile * tile, r), r, r, tile.shape) - mean * mean, 0))
+        contrast = spot - mean
+        candidate = (contrast > CONTRAST_SIGMA * std / 3) & (contrast > MIN_CONTRAST) & in_breast
+        ys, xs = np.nonzero(candidate[own])
+        if len(ys) == 0:
+            continue
+        ys += own.start
+        # Cilt çizgisi kenar etkisi: pencerenin tamamı meme içinde olmalı
+        mask = _integral(in_breast.astype(np.float32), r, np.float32)
+        inside = _box_mean(mask, r, r, tile.shape)[ys, xs] > 0.999
+        # Yalnızca kendi satırlarındaki adaylarda 3x3 yerel maksimum testi; komşular halo dahil
+        # maskelenmemiş kontrasttan okunur, böylece blok sınırındaki leke iki blokta da tepe olmaz.
+        # Eşitlikte önceki satır/sütundaki komşu kazanır: düz tepe tek nokta verir.
+        padded = np.pad(contrast, 1, constant_values=-np.inf)
+        value = padded[ys + 1, xs + 1]
+        peak = inside.copy()
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dy < 0 or (dy == 0 and dx < 0):
+                    peak &= value > padded[ys + 1 + dy, xs + 1 + dx]
+                elif dy or dx:
+                    peak &= value >= padded[ys + 1 + dy, xs + 1 + dx]
+        points.append(np.column_stack([ys[peak] + lo, xs[peak]]))
+    if not points:
+        return np.zeros((0, 2), dtype=np.intp), breast_pixels
+    return np.concatenate(points), breast_pixels
+
+
+def _cell_pairs(cell_keys, dy, dx):
+    # Dolu hücreler (np.unique ile sözlük sırasında) arasında (dy, dx) kaydırmasıyla komşu olan çiftler
+    flat = cell_keys[:, 0] * (1 << 32) + cell_keys[:, 1]
+    target = flat + dy * (1 << 32) + dx
+    pos = np.minimum(np.searchsorted(flat, target), len(flat) - 1)
+    found = flat[pos] == target
+    return np.nonzero(found)[0], pos[found]
+
+
+def _linked(points, start, count, ca, cb, link2):
+    """Her hücre çifti için iki hücre arasında bağlantı mesafesinde bir nokta çifti var mı."""
+    na, nb = count[ca], count[cb]
+    linked = np.zeros(len(ca), dtype=bool)
+    # Küçük hücre çiftleri: tüm nokta çiftleri tek seferde açılır
+    small = np.nonzero(na * nb <= SMALL_PAIR_BLOCK)[0]
+    if len(small):
+        m = na[small] * nb[small]
+        p = np.repeat(np.arange(len(small)), m)
+        k = np.arange(m.sum()) - np.repeat(np.cumsum(m) - m, m)
+        ia = start[ca[small]][p] + k // nb[small][p]
+        ib = start[cb[small]][p] + k % nb[small][p]
+        hit = ((points[ia] - points[ib]) ** 2).sum(axis=1) <= link2
+        linked[small[np.unique(p[hit])]] = True
+    # Büyük hücre çiftleri: bellek sınırlı bloklarla, ilk eşleşmede durulur
+    for j in np.nonzero(na * nb > SMALL_PAIR_BLOCK)[0]:
+        a = points[start[ca[j]]:start[ca[j]] + na[j]]
+        b = points[start[cb[j]]:start[cb[j]] + nb[j]]
+        step = max(1, MAX_PAIR_BLOCK // len(b))
+        for i in range(0, len(a), step):
+            if (((a[i:i + step, None, :] - b[None, :, :]) ** 2).sum(axis=2) <= link2).any():
+                linked[j] = True
+                break
+    return linked
+
+
+def cluster_points(points, link_px):
+    """Tek bağlantılı kümeleme; etiket dizisi döner.
+
+    Izgara hücresinin köşegeni bağlantı mesafesine eşit olduğundan aynı hücredeki
+    noktalar zaten aynı kümededir: bağlantı yalnızca dolu hücreler arasında aranır,
+    hücre grafında union-find ile bileşenler bulunur.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    keys = np.floor(points / (link_px / np.sqrt(2))).astype(np.int64)
+    cell_keys, cell_of = np.unique(keys, axis=0, return_inverse=True)
+    cell_of = cell_of.ravel()
+    order = np.argsort(cell_of, kind="stable")
+    points = points[order]
+    count = np.bincount(cell_of, minlength=len(cell_keys))
+    start = np.cumsum(count) - count
+
+    parent = np.arange(len(cell_keys))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    link2 = link_px * link_px
+    # 5x5 hücre penceresinin "ileri" yarısı: her komşu hücre çifti bir kez sınanır
+    for dy, dx in [(0, 1), (0, 2)] + [(dy, dx) for dy in (1, 2) for dx in range(-2, 3)]:
+        ca, cb = _cell_pairs(cell_keys, dy, dx)
+        if len(ca) == 0:
+            continue
+        linked = _linked(points, start, count, ca, cb, link2)
+        for a, b in zip(ca[linked], cb[linked]):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[ra] = rb
+    roots = np.array([find(i) for i in range(len(cell_keys))], dtype=np.intp)
+    return roots[cell_of]
+
+
+def describe_cluster(pts, pixel_spacing_mm):
+    mm = pts * pixel_spacing_mm
+    centered = mm - mm.mean(axis=0)
+    eigvals, eigvecs = np.linalg.eigh(np.cov(centered.T) if len(mm) > 1 else np.zeros((2, 2)))
+    major = eigvecs[:, -1]
+    proj = centered @ major
+    extent = float(np.ptp(proj)) if len(mm) > 1 else 0.0
+    width = float(np.ptp(centered @ eigvecs[:, 0])) if len(mm) > 1 else 0.0
+    area_cm2 = max(extent * width, 1.0) / 100.0
+    linearity = float(1 - eigvals[0] / eigvals[-1]) if eigvals[-1] > 0 else 0.0
+    return {
+        "count": int(len(pts)),
+        "extent_mm": round(extent, 1),
+        "width_mm": round(width, 1),
+        "per_cm2": round(len(pts) / area_cm2, 1),
+        "linearity": round(linearity, 2),
+        "center": tuple(int(v) for v in pts.mean(axis=0)),
+    }
+
+
+def suggest_distribution(points, pixel_spacing_mm):
+    """Dağılım önerisi ve önerinin dayandığı bölgenin özeti; yeterli kalsifikasyon yoksa (None, None)."""
+    if len(points) < MIN_CLUSTER_SIZE:
+        return None, None
+    # Dağılım, kümelerden daha kaba bağlantıyla birleştirilen bölgeler üzerinden değerlendirilir
+    labels = cluster_points(points, REGION_LINK_MM / pixel_spacing_mm)
+    uniq, counts = np.unique(labels, return_counts=True)
+    largest = counts.max()
+    # Kalsifikasyonlar tek bir bölgede toplanmıyorsa diffüz
+    if len(points) >= DIFFUSE_MIN_COUNT and largest < 0.5 * len(points):
+        return "Diffüz", None
+    if largest < MIN_CLUSTER_SIZE:
+        return None, None
+    region = describe_cluster(points[labels == uniq[np.argmax(counts)]], pixel_spacing_mm)
+    if region["extent_mm"] <= GROUPED_MAX_EXTENT_MM:
+        return "Gruplu", region
+    if region["linearity"] >= LINEAR_MIN_LINEARITY:
+        return "Lineer", region
+    return "Segmental", region
+
+
+def analyze_calcifications(pixels, pixel_spacing_mm=PIXEL_SPACING_MM):
+    points, breast_pixels = detect_spots(pixels, pixel_spacing_mm)
+    # Gürültülü görüntüde aday sayısı sınırlanır: kümeleme eşit aralıklı örnek üzerinde yapılır
+    sample = points
+    if len(points) > MAX_CLUSTER_POINTS:
+        sample = points[np.linspace(0, len(points) - 1, MAX_CLUSTER_POINTS).astype(np.intp)]
+    link_px = LINK_DISTANCE_MM / pixel_spacing_mm
+    labels = cluster_points(sample, link_px) if len(sample) else np.zeros(0, dtype=np.intp)
+    clusters = []
+    if len(sample):
+        uniq, counts = np.unique(labels, return_counts=True)
+        for label in uniq[counts >= MIN_CLUSTER_SIZE]:
+            clusters.append(describe_cluster(sample[labels == label], pixel_spacing_mm))
+    clusters.sort(key=lambda c: c["count"], reverse=True)
+    suggestion, region = suggest_distribution(sample, pixel_spacing_mm)
+    breast_cm2 = breast_pixels * pixel_spacing_mm ** 2 / 100.0
+    return {
+        "count": int(len(points)),
+        "clustered": int(len(sample)),
+        "per_cm2": round(len(points) / breast_cm2, 2) if breast_cm2 else 0.0,
+        "clusters": clusters,
+        "suggestion": suggestion,
+        "region": region,
+        "points": points,
+    }
@@ -0,0 +1,326 @@
+"""Çok süreçli çalışma: N adet birads_app.py sunucusu + yapışkan oturumlu yerel dengeleyici.
+
+Tek Streamlit süreci tüm oturumların betiğini tek Python yorumlayıcısında
+çalıştırır. Bu başlatıcı her çekirdek için ayrı bir Streamlit işçisi açar ve
+önlerine küçük bir Tornado ters vekil (proxy) koyar. Tarayıcı ilk istekte bir
+işçiye atanır (en az bağlantılı olan) ve "birads_worker" çerezi ile sonraki
+HTTP, websocket ve dosya yükleme isteklerinde aynı işçiye gider; istek ve
+yanıt gövdeleri dengeleyicide biriktirilmeden akışla aktarılır. İşçiler aynı
+çerez anahtarını (XSRF) ve veri klasörünü paylaşır; pahalı sonuçlar
+birads_cache ile süreçler arasında ortaktır. Ölen işçi yeniden başlatılır.
+
+    python birads_cluster.py --workers 4 --port 8501
+"""
+
+import argparse
+import logging
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import tornado.httpclient
+import tornado.httputil
+import tornado.ioloop
+import tornado.iostream
+import tornado.log
+import tornado.queues
+import tornado.web
+import tornado.websocket
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+COOKIE = "birads_worker"
+# İstemciye/işçiye aktarılmayan bağlantıya özgü (hop-by-hop) başlıklar
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers",
+    "transfer-encoding", "upgrade", "content-length",
+}
+MAX_BODY_BYTES = 200 << 20  # Streamlit varsayılan server.maxUploadSize
+# İstemciden okunup işçiye yazılmayı bekleyen en çok istek gövdesi parçası
+BODY_QUEUE_CHUNKS = 16
+_ABORT = object()
+
+
+class Worker:
+    def __init__(self, index, port, cookie_secret):
+        self.index = index
+        self.port = port
+        self.cookie_secret = cookie_secret
+        self.proc = None
+        self.connections = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "birads_app.py"),
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            # Çerez anahtarı komut satırından verilemez; tüm işçilerde aynı olmalı (XSRF)
+            env=dict(os.environ, STREAMLIT_SERVER_COOKIE_SECRET=self.cookie_secret),
+        )
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def wait_healthy(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.alive():
+                return False
+            try:
+                urllib.request.urlopen(self.url + "/_stcore/health", timeout=1)
+                return True
+            except OSError:
+                time.sleep(0.2)
+        return False
+
+    def stop(self):
+        if self.alive():
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+class Balancer:
+    def __init__(self, workers):
+        self.workers = workers
+
+    def pick(self, cookie):
+        """Çerezdeki işçi yaşıyorsa onu, değilse en az bağlantılı işçiyi döner; (işçi, yeni mi)."""
+        if cookie is not None and cookie.isdigit() and int(cookie) < len(self.workers):
+            worker = self.workers[int(cookie)]
+            if worker.alive():
+                return worker, False
+        live = [w for w in self.workers if w.alive()] or self.workers
+        return min(live, key=lambda w: w.connections), True
+
+    def watch(self):
+        # Ölen işçiyi aynı portta yeniden başlatır; çerezi olan oturumlar yeniden bağlanır
+        for worker in self.workers:
+            if not worker.alive():
+                print(f"İşçi {worker.index} (port {worker.port}) yeniden başlatılıyor", flush=True)
+                worker.start()
+
+
+def _forward_headers(request):
+    headers = {k: v for k, v in request.headers.get_all() if k.lower() not in HOP_HEADERS}
+    headers["X-Forwarded-For"] = request.remote_ip
+    headers["X-Forwarded-Host"] = request.host
+    return headers
+
+
+@tornado.web.stream_request_body
+class ProxyHandler(tornado.web.RequestHandler):
+    """HTTP isteklerini işçiye akışla aktarır; istek ve yanıt gövdeleri bellekte biriktirilmez.
+
+    İstek gövdesi parçaları sınırlı bir kuyruktan işçiye yazılır (kuyruk doluysa
+    istemciden okuma bekler), yanıt parçaları geldikçe istemciye iletilir.
+    """
+
+    SUPPORTED_METHODS = ("GET", "HEAD", "POST", "PUT", "DELETE", "OPTIONS")
+
+    def initialize(self, balancer):
+        self.balancer = balancer
+        self.worker = None
+        self.body = None
+        self.upstream = None
+        self.upstream_headers = None
+        self.client_closed = False
+
+    def prepare(self):
+        self.worker, new = self.balancer.pick(self.get_cookie(COOKIE))
+        if new:
+            self.set_cookie(COOKIE, str(self.worker.index), httponly=True, samesite="Strict")
+        headers = _forward_headers(self.request)
+        producer = None
+        if self.request.method in ("POST", "PUT"):
+            self.body = tornado.queues.Queue(maxsize=BODY_QUEUE_CHUNKS)
+            producer = self._produce_body
+            if "Content-Length" in self.request.headers:
+                headers["Content-Length"] = self.request.headers["Content-Length"]
+        # İşçiye istek hemen başlatılır; gövde geldikçe body_producer ile yazılır
+        self.upstream = tornado.httpclient.AsyncHTTPClient().fetch(
+            tornado.httpclient.HTTPRequest(
+                self.worker.url + self.request.uri,
+                method=self.request.method,
+                headers=headers,
+                body_producer=producer,
+                header_callback=self._on_header,
+                streaming_callback=self._on_chunk,
+                allow_nonstandard_methods=True,
+                follow_redirects=False,
+                decompress_response=False,
+                request_timeout=600,
+            ),
+            raise_error=False,
+        )
+
+    async def data_received(self, chunk):
+        if self.body is not None:
+            await self.body.put(chunk)
+
+    async def _produce_body(self, write):
+        while True:
+            chunk = await self.body.get()
+            if chunk is None:
+                return
+            if chunk is _ABORT:
+                raise tornado.iostream.StreamClosedError()  # Yarım gövde işçiye tamamlanmış gibi gönderilmez
+            await write(chunk)
+
+    def _on_header(self, line):
+        if line.startswith("HTTP/"):
+            self.upstream_headers = tornado.httputil.HTTPHeaders()
+            start = tornado.httputil.parse_response_start_line(line.strip())
+            self.set_status(start.code, start.reason)
+        elif line.strip():
+            self.upstream_headers.parse_line(line)
+        else:
+            self.clear_header("Content-Type")
+            for name, value in self.upstream_headers.get_all():
+                if name.lower() in HOP_HEADERS:
+                    continue
+                if name.lower() == "set-cookie":
+                    self.add_header(name, value)
+                else:
+                    self.set_header(name, value)
+
+    def _on_chunk(self, chunk):
+        if self.client_closed or self.request.method == "HEAD":
+            return
+        self.write(chunk)
+        self.flush()
+
+    async def _proxy(self):
+        if self.body is not None:
+            await self.body.put(None)
+        try:
+            response = await self.upstream
+        except OSError:  # Bağlantı reddedildi vb.; raise_error=False yalnızca HTTP hatalarını yanıta çevirir
+            response = None
+        if response is None or response.code == 599:
+            raise tornado.web.HTTPError(502, f"İşçi {self.worker.index} yanıt vermedi")
+
+    get = head = post = put = delete = options = _proxy
+
+    def on_connection_close(self):
+        self.client_closed = True
+        if self.upstream is not None:
+            self.upstream.add_done_callback(lambda f: f.exception())  # _proxy çalışmayabilir; hata sessizce bırakılır
+        if self.body is not None:
+            tornado.ioloop.IOLoop.current().add_callback(self.body.put, _ABORT)
+
+    def compute_etag(self):
+        return None  # İşçinin ETag'i olduğu gibi aktarılır
+
+
+class StreamProxyHandler(tornado.websocket.WebSocketHandler):
+    """/_stcore/stream websocket'ini seçilen işçiye iki yönlü aktarır."""
+
+    def initialize(self, balancer):
+        self.balancer = balancer
+        self.upstream = None
+        self.worker = None
+        self.pending = []
+
+    def select_subprotocol(self, subprotocols):
+        # Streamlit ilk alt protokolü ("streamlit") seçer; ek alt protokoller XSRF/oturum bilgisidir
+        return subprotocols[0] if subprotocols else None
+
+    async def open(self):
+        self.worker, _ = self.balancer.pick(self.get_cookie(COOKIE))
+        self.worker.connections += 1
+        protocols = self.request.headers.get("Sec-WebSocket-Protocol", "")
+        request = tornado.httpclient.HTTPRequest(
+            self.worker.url.replace("http", "ws", 1) + self.request.uri,
+            headers={k: v for k, v in _forward_headers(self.request).items()
+                     if k.lower() in ("cookie", "origin", "host", "x-forwarded-for", "x-forwarded-host")},
+        )
+        try:
+            self.upstream = await tornado.websocket.websocket_connect(
+                request, subprotocols=[p.strip() for p in protocols.split(",") if p.strip()] or None,
+                max_message_size=MAX_BODY_BYTES,
+            )
+        except Exception:
+            self.close(1011, "İşçiye bağlanılamadı")
+            return
+        for message in self.pending:
+            self.upstream.write_message(message, binary=isinstance(message, bytes))
+        self.pending = []
+        tornado.ioloop.IOLoop.current().add_callback(self._pump)
+
+    async def _pump(self):
+        while True:
+            message = await self.upstream.read_message()
+            if message is None:
+                self.close()
+                return
+            try:
+                await self.write_message(message, binary=isinstance(message, bytes))
+            except tornado.websocket.WebSocketClosedError:
+                return
+
+    def on_message(self, message):
+        if self.upstream is None:
+            self.pending.append(message)
+        else:
+            self.upstream.write_message(message, binary=isinstance(message, bytes))
+
+    def on_close(self):
+        if self.worker is not None:
+            self.worker.connections -= 1
+        if self.upstream is not None:
+            self.upstream.close()
+
+
+def make_app(balancer):
+    tornado.httpclient.AsyncHTTPClient.configure(None, max_body_size=MAX_BODY_BYTES)
+    return tornado.web.Application([
+        (r"/_stcore/stream", StreamProxyHandler, {"balancer": balancer}),
+        (r"/.*", ProxyHandler, {"balancer": balancer}),
+    ], websocket_max_message_size=MAX_BODY_BYTES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--port", type=int, default=8501, help="dengeleyici portu")
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=8510, help="işçiler bu porttan itibaren dinler")
+    args = parser.parse_args(argv)
+    tornado.log.enable_pretty_logging()
+    tornado.log.access_log.setLevel(logging.WARNING)
+
+    cookie_secret = os.environ.get("BIRADS_COOKIE_SECRET") or secrets.token_hex(32)
+    workers = [Worker(i, args.base_port + i, cookie_secret) for i in range(args.workers)]
+    balancer = Balancer(workers)
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            if not worker.wait_healthy():
+                sys.exit(f"İşçi {worker.index} (port {worker.port}) başlatılamadı")
+        make_app(balancer).listen(args.port, address=args.address, max_body_size=MAX_BODY_BYTES)
+        tornado.ioloop.PeriodicCallback(balancer.watch, 2000).start()
+        print(f"BI-RADS çok süreçli mod: http://{args.address}:{args.port} ({len(workers)} işçi)", flush=True)
+        # SIGTERM de Ctrl+C gibi işlenir; işçiler finally bloğunda kapatılır
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        tornado.ioloop.IOLoop.current().start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+# --- HL7 v2 / FHIR sonuç dışa aktarımı ---
+# Kaydedilen her sınıflandırma hastane sistemine yeniden yazılmasın diye
+# HL7 v2 ORU^R01 mesajına veya FHIR DiagnosticReport kaynağına çevrilir.
+# Mesajlar önce veri klasöründeki SQLite giden kutusuna (outbox) yazılır;
+# Streamlit yalnızca tek bir INSERT bekler. Arka plan göndericisi kuyruğu
+# toplu olarak, kalıcı bağlantı üzerinden (MLLP soketi veya requests.Session)
+# iletir. Kısa kesintiler tenacity ile üstel bekleyerek yeniden denenir;
+# denemeler tükenirse kayıt kuyrukta kalır ve daha uzun bir beklemeyle tekrar
+# alınır. Karşı tarafın reddettiği mesajlar "failed" olarak işaretlenir.
+# Çok süreçli çalışmada (birads_cluster.py) kayıtlar süreli olarak
+# sahiplenildiği için aynı mesajı iki işçi göndermez.
+#
+# Yapılandırma (ortam değişkenleri):
+#   BIRADS_EXPORT_URL    mllp://host:2575 (HL7 v2) veya http(s)://sunucu/fhir (FHIR);
+#                        boşsa dışa aktarım kapalıdır
+#   BIRADS_EXPORT_BATCH  toplu gönderim boyutu (varsayılan 50)
+#   BIRADS_EXPORT_FACILITY  MSH-4 / kimlik sistemi adı (varsayılan RADIOLOGEAN)
+#   BIRADS_EXPORT_PID3   "case" ise vaka numarası HL7 PID-3'e (hasta kimliği) de yazılır;
+#                        varsayılan boş PID-3. Vaka numarası her zaman OBR-3 (filler
+#                        order number) ve OBR-18'de gönderilir.
+
+from collections import deque
+from datetime import datetime
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+import uuid
+
+import requests
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from birads_history import data_path
+
+OUTBOX_FILE = "export.sqlite"
+BATCH_SIZE = int(os.environ.get("BIRADS_EXPORT_BATCH", 50))
+FACILITY = os.environ.get("BIRADS_EXPORT_FACILITY", "RADIOLOGEAN")
+# Vaka numarası yalnızca hastanede hasta kimliği olarak kullanılıyorsa PID-3'e yazılır
+PID3_FROM_CASE = os.environ.get("BIRADS_EXPORT_PID3", "") == "case"
+# Gönderim denemesi başına tenacity ayarı; sonrasında kayıt kuyruğa geri bırakılır
+RETRY_ATTEMPTS = 4
+RETRY_MAX_WAIT = 10
+# Kuyruk düzeyinde yeniden deneme beklemesi üst sınırı (s)
+REQUEUE_MAX_DELAY = 600
+# Sahiplenme süresi: bu süre içinde bitmeyen gönderim başka sürece devredilir
+CLAIM_SECONDS = 300
+SENT_TTL_DAYS = 7
+# Verim penceresi (s)
+RATE_WINDOW = 60
+
+MLLP_START, MLLP_END = b"\x0b", b"\x1c\x0d"
+
+
+class TransportError(Exception):
+    """Geçici gönderim hatası; toplu gönderimin kalanı yeniden denenir.
+
+    partial: hata öncesinde sonucu (ACK) alınmış mesajlar.
+    """
+
+    def __init__(self, message, partial=None):
+        super().__init__(message)
+        self.partial = partial or {}
+
+
+# --- Dönüştürme ---
+
+def _hl7_escape(value):
+    value = "" if value is None else str(value)
+    for ch, esc in (("\\", "\\E\\"), ("|", "\\F\\"), ("^", "\\S\\"), ("&", "\\T\\"), ("~", "\\R\\")):
+        value = value.replace(ch, esc)
+    return value.replace("\r\n", "\\.br\\").replace("\n", "\\.br\\").replace("\r", "\\.br\\")
+
+
+def _hl7_time(iso):
+    return datetime.fromisoformat(iso).strftime("%Y%m%d%H%M%S")
+
+
+def to_hl7(record, message_id):
+    """Kaydı HL7 v2.5 ORU^R01 mesajına çevirir (segment ayırıcı \\r).
+
+    Vaka numarası bir inceleme (accession) numarasıdır: OBR-3 ve OBR-18'e yazılır;
+    PID-3 yalnızca BIRADS_EXPORT_PID3=case ile doldurulur.
+    """
+    when = _hl7_time(record["time"])
+    case_id = _hl7_escape(record["case_id"])
+    reader = _hl7_escape(record["reader"])
+    category = record["category"]
+    inputs = record.get("inputs") or {}
+    findings = ", ".join(inputs.get("finding_type") or []) or "Bulgu yok"
+    segments = [
+        f"MSH|^~\\&|BIRADS_APP|{_hl7_escape(FACILITY)}|||{when}||ORU^R01^ORU_R01|{message_id}|P|2.5|||AL|NE||UNICODE UTF-8",
+        f"PID|1||{case_id}^^^{_hl7_escape(FACILITY)}" if PID3_FROM_CASE else "PID|1",
+        f"OBR|1||{case_id}|BIRADS^BI-RADS değerlendirme^L|||{when}|||||||||||{case_id}||||{when}||MG|F|||||||{reader}",
+        f"OBX|1|CWE|BIRADS^BI-RADS kategori^L||{_hl7_escape(category.split()[-1])}^{_hl7_escape(category)}^L||||||F|||{when}||{reader}",
+        f"OBX|2|TX|MGMT^Öneri^L||{_hl7_escape(record['management'])}||||||F|||{when}||{reader}",
+        f"OBX|3|TX|FIND^Bulgular^L||{_hl7_escape(findings)}||||||F|||{when}||{reader}",
+    ]
+    return "\r".join(segments) + "\r"
+
+
+def to_fhir(record, message_id):
+    """Kaydı FHIR R4 DiagnosticReport kaynağına çevirir."""
+    system = f"urn:{FACILITY.lower()}"
+    inputs = record.get("inputs") or {}
+    # Kayıt zamanı yerel saattir; FHIR dateTime/instant saat dilimi ister
+    when = datetime.fromisoformat(record["time"]).astimezone().isoformat()
+    return {
+        "resourceType": "DiagnosticReport",
+        "identifier": [
+            {"system": f"{system}:message", "value": message_id},
+            {"system": f"{system}:case", "value": record["case_id"]},
+        ],
+        "status": "final",
+        "category": [{"coding": [{
+            "system": "http://terminology.hl7.org/CodeSystem/v2-0074", "code": "RAD", "display": "Radiology",
+        }]}],
+        "code": {"text": "Mamografi BI-RADS değerlendirmesi"},
+        "subject": {"identifier": {"system": f"{system}:case", "value": record["case_id"]}},
+        "effectiveDateTime": when,
+        "issued": when,
+        "resultsInterpreter": [{"display": record["reader"]}],
+        "conclusion": f"{record['category']}: {record['management']}",
+        "conclusionCode": [{"coding": [{"system": f"{system}:birads", "code": record["category"]}],
+                            "text": ", ".join(inputs.get("finding_type") or []) or "Bulgu yok"}],
+    }
+
+
+# --- Taşıyıcılar ---
+
+class MllpTransport:
+    """Kalıcı MLLP soketi; toplu gönderimde mesajlar art arda yazılır, ACK'ler sonra okunur."""
+
+    format = "hl7"
+
+    def __init__(self, host, port, timeout=30):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.sock = None
+        self.buffer = b""
+
+    def _connect(self):
+        if self.sock is None:
+            self.sock = socket.create_connection(self.address, timeout=self.timeout)
+            # Küçük MLLP çerçeveleri Nagle + gecikmeli ACK yüzünden ~40 ms beklemesin
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.buffer = b""
+        return self.sock
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _read_frame(self):
+        while MLLP_END not in self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("MLLP bağlantısı kapandı")
+            self.buffer += chunk
+        frame, self.buffer = self.buffer.split(MLLP_END, 1)
+        return frame.lstrip(MLLP_START).decode("utf-8", "replace")
+
+    def send_batch(self, messages):
+        """[(mesaj kimliği, yük)] -> {mesaj kimliği: kabul edildi mi}."""
+        ids = {message_id for message_id, _ in messages}
+        results = {}
+        try:
+            sock = self._connect()
+            sock.sendall(b"".join(MLLP_START + payload + MLLP_END for _, payload in messages))
+            while len(results) < len(messages):
+                ack = {s.split("|", 1)[0]: s.split("|") for s in self._read_frame().split("\r") if s}
+                msa = ack.get("MSA")
+                if msa is None or len(msa) < 3:
+                    raise TransportError("Geçersiz ACK")
+                if msa[2] in ids:  # Önceki yarım kalmış gönderimin geç ACK'i atlanır
+                    results[msa[2]] = msa[1] in ("AA", "CA")
+            return results
+        except (OSError, TransportError) as e:
+            self.close()
+            raise TransportError(str(e), results) from e
+
+
+class FhirTransport:
+    """FHIR sunucusuna "batch" Bundle ile toplu gönderim; requests.Session bağlantıyı açık tutar."""
+
+    format = "fhir"
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Content-Type"] = "application/fhir+json"
+
+    def close(self):
+        self.session.close()
+
+    def send_batch(self, messages):
+        entries = []
+        for message_id, payload in messages:
+            resource = json.loads(payload)
+            entries.append({
+                "resource": resource,
+                # Yeniden denemede aynı rapor ikinci kez oluşturulmaz
+                "request": {"method": "POST", "url": "DiagnosticReport",
+                            "ifNoneExist": f"identifier={resource['identifier'][0]['system']}|{message_id}"},
+            })
+        bundle = {"resourceType": "Bundle", "type": "batch", "entry": entries}
+        try:
+            response = self.session.post(self.base_url, data=json.dumps(bundle, ensure_ascii=False).encode("utf-8"),
+                                         timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TransportError(str(e)) from e
+        if response.status_code >= 500 or response.status_code == 429:
+            raise TransportError(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            return {message_id: False for message_id, _ in messages}
+        # 2xx ama batch-response olmayan gövde (ör. vekil sunucunun HTML sayfası) geçici hata sayılır
+        try:
+            body = response.json()
+            if body.get("resourceType") != "Bundle" or body.get("type") != "batch-response":
+                raise ValueError("batch-response değil")
+            statuses = [int(str(entry["response"]["status"]).split()[0]) for entry in body.get("entry", [])]
+        except (ValueError, TypeError, KeyError, AttributeError, IndexError) as e:
+            raise TransportError(f"Geçersiz FHIR yanıtı (HTTP {response.status_code}): {e}") from e
+        if len(statuses) != len(messages):
+            raise TransportError("Eksik batch yanıtı")
+        results = {}
+        for (message_id, _), status in zip(messages, statuses):
+            if status >= 500:
+                raise TransportError(f"{message_id}: HTTP {status}", results)
+            results[message_id] = status < 400
+        return results
+
+
+def make_transport(url):
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme == "mllp":
+        return MllpTransport(parts.hostname, parts.port or 2575)
+    if parts.scheme in ("http", "https"):
+        return FhirTransport(url)
+    raise ValueError(f"Desteklenmeyen dışa aktarım adresi: {url}")
+
+
+# --- Giden kutusu ---
+
+class Outbox:
+    """SQLite giden kutusu; iş parçacığı başına bağlantı (birads_cache ile aynı düzen)."""
+
+    def __init__(self, path=None):
+        self.path = path or data_path(OUTBOX_FILE)
+        self.local = threading.local()
+        self.owner = uuid.uuid4().hex
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, message_id TEXT UNIQUE, "
+                "format TEXT, payload BLOB, status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, "
+                "next_try REAL, claim_owner TEXT, claim_until REAL, last_error TEXT, created REAL, sent REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, next_try)")
+            self.local.conn = conn
+        return conn
+
+    def put(self, message_id, fmt, payload):
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO outbox (message_id, format, payload, next_try, created) VALUES (?, ?, ?, ?, ?)",
+            (message_id, fmt, sqlite3.Binary(payload), now, now),
+        )
+
+    def claim(self, fmt, limit):
+        """Gönderilmeye hazır en eski kayıtları bu süreç adına sahiplenir."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, message_id, payload FROM outbox WHERE status = 'pending' AND format = ? "
+                "AND next_try <= ? AND (claim_until IS NULL OR claim_until < ?) ORDER BY id LIMIT ?",
+                (fmt, now, now, limit),
+            ).fetchall()
+            conn.executemany("UPDATE outbox SET claim_owner = ?, claim_until = ? WHERE id = ?",
+                             [(self.owner, now + CLAIM_SECONDS, row[0]) for row in rows])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [(message_id, bytes(payload)) for _, message_id, payload in rows]
+
+    def complete(self, results):
+        now = time.time()
+        conn = self._conn()
+        conn.executemany(
+            "UPDATE outbox SET status = ?, sent = ?, attempts = attempts + 1, claim_until = NULL, "
+            "last_error = ? WHERE message_id = ?",
+            [("sent", now, None, m) if ok else ("failed", None, "Karşı taraf reddetti", m) for m, ok in results.items()],
+        )
+
+    def release(self, message_ids, error):
+        # Denemeler tükendi: kayıt kuyrukta kalır, beklemesi deneme sayısıyla büyür
+        now = time.time()
+        self._conn().executemany(
+            "UPDATE outbox SET attempts = attempts + 1, claim_until = NULL, last_error = ?, "
+            "next_try = ? + MIN(?, 5 * (1 << MIN(attempts, 16))) WHERE message_id = ?",
+            [(error, now, REQUEUE_MAX_DELAY, m) for m in message_ids],
+        )
+
+    def next_due(self, fmt):
+        # Başka bir sürecin sahiplendiği kayıt en erken sahiplik süresi dolunca alınabilir
+        row = self._conn().execute(
+            "SELECT MIN(MAX(next_try, COALESCE(claim_until, 0))) FROM outbox WHERE status = 'pending' AND format = ?",
+            (fmt,),
+        ).fetchone()
+        return row[0]
+
+    def depth(self):
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict({"pending": 0, "sent": 0, "failed": 0}, **dict(rows))
+
+    def prune(self, days):
+        self._conn().execute("DELETE FROM outbox WHERE status = 'sent' AND sent < ?", (time.time() - days * 86400,))
+
+
+# --- Gönderici ---
+
+class Exporter:
+    """Arka plan göndericisi; enqueue çağrısı yalnızca diske yazar ve göndericiyi uyandırır."""
+
+    def __init__(self, url, outbox=None, batch_size=BATCH_SIZE):
+        self.url = url
+        self.transport = make_transport(url)
+        self.outbox = outbox or Outbox()
+        self.batch_size = batch_size
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopping = False
+        self.sent_times = deque()
+        self.last_error = None
+        self.last_batch_ms = None
+
+    def enqueue(self, record):
+        message_id = uuid.uuid4().hex
+        if self.transport.format == "hl7":
+            payload = to_hl7(record, message_id).encode("utf-8")
+        else:
+            payload = json.dumps(to_fhir(record, message_id), ensure_ascii=False).encode("utf-8")
+        self.outbox.put(message_id, self.transport.format, payload)
+        self.start()
+        with self.cond:
+            self.cond.notify()
+        return message_id
+
+    def start(self):
+        with self.cond:
+            # Beklenmedik biçimde ölen iş parçacığı yeniden başlatılır
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="birads-export", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join()
+        self.transport.close()
+
+    def _run(self):
+        try:
+            self.outbox.prune(SENT_TTL_DAYS)
+        except sqlite3.Error as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        while not self.stopping:
+            # Hiçbir hata göndericiyi durdurmaz; hata last_error ile raporlanır, döngü bekleyip sürer
+            try:
+                if self.send_once():
+                    continue
+                due = self.outbox.next_due(self.transport.format)
+                delay = 30 if due is None else min(30, max(0.05, due - time.time()))
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                delay = 5
+            with self.cond:
+                if not self.stopping:
+                    self.cond.wait(delay)
+
+    def send_once(self):
+        """Bir toplu gönderim yapar; gönderilecek kayıt yoksa veya gönderim yarım kaldıysa False döner."""
+        batch = self.outbox.claim(self.transport.format, self.batch_size)
+        if not batch:
+            return False
+        start = time.monotonic()
+        results = {}
+        try:
+            for attempt in Retrying(
+                stop=stop_after_attempt(RETRY_ATTEMPTS),
+                wait=wait_exponential(multiplier=0.5, max=RETRY_MAX_WAIT),
+                retry=retry_if_exception_type(TransportError),
+                reraise=True,
+            ):
+                with attempt:
+                    # Yeniden denemede yalnızca sonucu alınmamış mesajlar gönderilir
+                    try:
+                        results.update(self.transport.send_batch([m for m in batch if m[0] not in results]))
+                    except TransportError as e:
+                        results.update(e.partial)
+                        raise
+        except Exception as e:
+            # Taşıyıcı dışı hatalarda da (ör. beklenmeyen yanıt) sahiplenilen kayıtlar kuyruğa geri bırakılır
+            self.last_error = str(e) if isinstance(e, TransportError) else f"{type(e).__name__}: {e}"
+            self.outbox.release([m for m, _ in batch if m not in results], self.last_error)
+        else:
+            self.last_error = None
+        self.outbox.complete(results)
+        self.last_batch_ms = (time.monotonic() - start) * 1000
+        self.sent_times.extend([time.time()] * sum(results.values()))
+        return len(results) == len(batch)
+
+    def stats(self):
+        now = time.time()
+        while self.sent_times and self.sent_times[0] < now - RATE_WINDOW:
+            self.sent_times.popleft()
+        return dict(
+            self.outbox.depth(),
+            per_second=len(self.sent_times) / RATE_WINDOW,
+            last_batch_ms=self.last_batch_ms,
+            last_error=self.last_error,
+            running=self.thread is not None and self.thread.is_alive(),
+        )
+
+
+_EXPORTER = None
+_EXPORTER_LOCK = threading.Lock()
+
+
+def exporter():
+    """BIRADS_EXPORT_URL tanımlıysa süreç başına tek gönderici; değilse None."""
+    global _EXPORTER
+    url = os.environ.get("BIRADS_EXPORT_URL")
+    if not url:
+        return None
+    with _EXPORTER_LOCK:
+        if _EXPORTER is None:
+            _EXPORTER = Exporter(url)
+        # Önceki çalışmadan kalan kayıtlar da gönderilir; ölen gönderici yeniden başlar
+        _EXPORTER.start()
+        return _EXPORTER
+
+
+def enqueue_export(record):
+    exp = exporter()
+    return exp.enqueue(record) if exp else None
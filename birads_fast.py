@@ -0,0 +1,187 @@
+"""Hızlı okuma modu: Streamlit rerun'ı olmadan kural motorunu doğrudan çağıran tek sayfalık arayüz.
+
+Tornado (Streamlit ile birlikte kurulu) üzerinde düz HTML + küçük JS sunar. Her
+form değişikliği tarayıcıdaki önbellekte bulunmazsa tek bir küçük /api/classify
+çağrısı yapar; sonuç aynı result-card/birads-* stilleriyle gösterilir. Kısa yazım
+kutusu her tuş vuruşunda /api/shorthand ile ayrıştırılır ve formu doldurur.
+
+    python birads_fast.py --port 8600
+"""
+
+import argparse
+from functools import lru_cache
+import json
+import os
+import sys
+
+import tornado.ioloop
+import tornado.web
+
+from birads_rules import (
+    FINDING_TYPES, SHAPES, BENIGN_MORPHS, CALC_MORPHS, ASYM_TYPES,
+    margin_options, calc_dist_options, classify,
+)
+from birads_shorthand import parse as parse_shorthand
+
+if getattr(sys, 'frozen', False):
+    BASE_DIR = sys._MEIPASS
+else:
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+INPUT_FIELDS = {
+    "exam_complete", "finding_type", "shape", "margin", "stable_2yr", "calc_morph", "calc_dist",
+    "asym_type", "prev_surgery", "skin_retraction", "nipple_retraction",
+}
+MAX_SHORTHAND = 500
+# Tek değerli alanların izin verilen değerleri (None: alan boş bırakılabilir)
+CHOICES = {
+    "exam_complete": ["Evet", "Hayır"],
+    "shape": [None] + SHAPES,
+    "calc_morph": [None] + CALC_MORPHS,
+    "asym_type": [None] + ASYM_TYPES,
+    "prev_surgery": ["Hayır", "Evet"],
+}
+FLAGS = {"stable_2yr", "skin_retraction", "nipple_retraction"}
+
+
+def vocabulary():
+    # Form seçenekleri tek kaynaktan (birads_rules) sayfaya gömülür
+    return {
+        "finding_types": FINDING_TYPES,
+        "shapes": SHAPES,
+        "margins": {s: margin_options(s) for s in SHAPES},
+        "calc_morphs": CALC_MORPHS,
+        "benign_morphs": BENIGN_MORPHS,
+        "calc_dists": {m: calc_dist_options(m) for m in CALC_MORPHS},
+        "asym_types": ASYM_TYPES,
+    }
+
+
+def check_inputs(inputs):
+    """İstek gövdesini formda seçilebilen değerlere göre doğrular; geçersizse ValueError."""
+    if not isinstance(inputs, dict):
+        raise ValueError("Gövde bir JSON nesnesi olmalı")
+    unknown = set(inputs) - INPUT_FIELDS
+    if unknown:
+        raise ValueError(f"Bilinmeyen alan: {', '.join(sorted(unknown))}")
+    finding_type = inputs.get("finding_type") or []
+    if not isinstance(finding_type, list) or not all(isinstance(t, str) and t in FINDING_TYPES for t in finding_type):
+        raise ValueError(f"finding_type şu bulguların listesi olmalı: {', '.join(FINDING_TYPES)}")
+    if len(set(finding_type)) != len(finding_type):
+        raise ValueError("finding_type tekrar eden bulgu içeriyor")
+    for field, options in CHOICES.items():
+        if field in inputs and not (isinstance(inputs[field], (str, type(None))) and inputs[field] in options):
+            raise ValueError(f"Geçersiz {field}: {inputs[field]!r}")
+    for field in FLAGS & set(inputs):
+        if not isinstance(inputs[field], bool):
+            raise ValueError(f"{field} true/false olmalı")
+    margin = inputs.get("margin")
+    shape = inputs.get("shape")
+    margins = margin_options(shape) if shape else {m for s in SHAPES for m in margin_options(s)}
+    if margin is not None and not (isinstance(margin, str) and margin in margins):
+        raise ValueError(f"Geçersiz margin: {margin!r}" + (f" ({shape} kitlede seçilemez)" if shape else ""))
+    calc_dist = inputs.get("calc_dist")
+    if calc_dist is not None and calc_dist not in calc_dist_options(inputs.get("calc_morph")):
+        raise ValueError(f"Geçersiz calc_dist: {calc_dist!r}")
+
+
+def form_inputs(inputs):
+    """Kısa yazım girdilerini hızlı arayüz formunun göndereceği girdilere çevirir.
+
+    Verilmeyen seçimler formun varsayılanını alır; görünürlük kuralları
+    fast_ui/index.html'deki applyInputs() + collect() ile aynıdır.
+    """
+    if inputs["exam_complete"] == "Hayır":
+        return {"exam_complete": "Hayır"}
+    finding_type = inputs["finding_type"]
+    combined = "Kitle" in finding_type and "Kalsifikasyon" in finding_type
+    out = {"exam_complete": inputs["exam_complete"], "finding_type": finding_type}
+    if "Kitle" in finding_type:
+        out["shape"] = inputs["shape"] or SHAPES[0]
+        margins = margin_options(out["shape"])
+        out["margin"] = inputs["margin"] if inputs["margin"] in margins else margins[0]
+    if "Kalsifikasyon" in finding_type:
+        out["calc_morph"] = inputs["calc_morph"] or CALC_MORPHS[0]
+        dists = calc_dist_options(out["calc_morph"])
+        if dists:
+            out["calc_dist"] = inputs["calc_dist"] if inputs["calc_dist"] in dists else dists[0]
+    if combined or ("Kitle" in finding_type and out["shape"] in ["Yuvarlak", "Oval"] and out["margin"] == "Düzgün"):
+        out["stable_2yr"] = inputs["stable_2yr"]
+    if combined:
+        return out
+    if "Asimetri" in finding_type:
+        out["asym_type"] = inputs["asym_type"] or ASYM_TYPES[0]
+    out["skin_retraction"] = inputs["skin_retraction"]
+    out["nipple_retraction"] = inputs["nipple_retraction"]
+    if "Architectural Distortion" in finding_type:
+        out["prev_surgery"] = inputs["prev_surgery"]
+    return out
+
+
+@lru_cache(maxsize=4096)
+def classify_cached(key):
+    return json.dumps(classify(**json.loads(key)), ensure_ascii=False)
+
+
+class IndexHandler(tornado.web.RequestHandler):
+    def initialize(self, page):
+        self.page = page
+
+    def get(self):
+        self.set_header("Content-Type", "text/html; charset=utf-8")
+        self.set_header("Cache-Control", "no-cache")
+        self.write(self.page)
+
+
+class ClassifyHandler(tornado.web.RequestHandler):
+    def post(self):
+        try:
+            inputs = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise tornado.web.HTTPError(400, "Geçersiz JSON")
+        try:
+            check_inputs(inputs)
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+        inputs["finding_type"] = sorted(inputs.get("finding_type") or [], key=FINDING_TYPES.index)
+        key = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.write(classify_cached(key))
+
+
+class ShorthandHandler(tornado.web.RequestHandler):
+    def get(self):
+        text = self.get_argument("q", "")
+        if len(text) > MAX_SHORTHAND:
+            raise tornado.web.HTTPError(400, "Kısa yazım çok uzun")
+        parsed = parse_shorthand(text)
+        # Sonuç formda görünen girdilerle hesaplanır; sayfa ikinci bir /api/classify çağrısı yapmaz
+        parsed["form"] = form_inputs(parsed["inputs"])
+        key = json.dumps(parsed["form"], sort_keys=True, ensure_ascii=False)
+        parsed["result"] = json.loads(classify_cached(key))
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.write(json.dumps(parsed, ensure_ascii=False))
+
+
+def make_app():
+    with open(os.path.join(BASE_DIR, "fast_ui", "index.html"), encoding="utf-8") as f:
+        page = f.read().replace("/*VOCABULARY*/null", json.dumps(vocabulary(), ensure_ascii=False))
+    return tornado.web.Application([
+        (r"/", IndexHandler, {"page": page}),
+        (r"/api/classify", ClassifyHandler),
+        (r"/api/shorthand", ShorthandHandler),
+    ], compress_response=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BI-RADS hızlı okuma arayüzü")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--address", default="127.0.0.1")
+    args = parser.parse_args(argv)
+    make_app().listen(args.port, address=args.address)
+    print(f"BI-RADS hızlı okuma modu: http://{args.address}:{args.port}")
+    tornado.ioloop.IOLoop.current().start()
+
+
+if __name__ == "__main__":
+    main()
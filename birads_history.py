@@ -0,0 +1,42 @@
+# --- Sınıflandırma geçmişi ---
+# Kaydedilen her sonuç (vaka no, okuyucu, girdiler, kategori) veri klasöründeki
+# JSON Lines dosyasına eklenir. Çift okuma analizi ve diğer raporlar buradan okur.
+
+from datetime import datetime
+import json
+import os
+
+import pandas as pd
+
+# Paketlenmiş (PyInstaller) sürümde uygulama klasörü geçicidir; veri kullanıcı klasöründe tutulur
+DATA_DIR = os.environ.get("BIRADS_DATA_DIR", os.path.join(os.path.expanduser("~"), ".birads_app"))
+HISTORY_FILE = "history.jsonl"
+
+HISTORY_COLUMNS = ["time", "case_id", "reader", "category", "management", "inputs"]
+
+
+def data_path(name):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def append_record(case_id, reader, inputs, result, path=None):
+    record = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "case_id": str(case_id).strip(),
+        "reader": str(reader).strip(),
+        "category": result["category"],
+        "management": result["management"],
+        "inputs": inputs,
+    }
+    with open(path or data_path(HISTORY_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+def load_history(path=None):
+    path = path or data_path(HISTORY_FILE)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    df = pd.read_json(path, lines=True, dtype={"case_id": str, "reader": str})
+    return df.reindex(columns=HISTORY_COLUMNS)
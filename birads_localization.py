@@ -0,0 +1,231 @@
+# --- CC/MLO lezyon lokalizasyonu ve projeksiyonlar arası eşleştirme ---
+# Her bulgu taraf, görünüm (CC/MLO), saat kadranı ve meme başına uzaklık ile
+# girilir. Aynı lezyon iki projeksiyonda meme başına yaklaşık aynı uzaklıkta
+# izlendiğinden (arc/triangülasyon kuralı) eşleştirme uzaklığa göre sıralı bir
+# indeks üzerinde yapılır: her CC bulgusu için yalnızca tolerans penceresindeki
+# MLO adaylarından uzaklığa en yakın birkaçı alınır, adaylar maliyete göre
+# sıralanıp açgözlü atanır. Toplam maliyet O(n log n).
+
+from bisect import bisect_left, bisect_right
+import math
+
+from birads_rules import classify, highest_category, suspicion_rank
+
+SIDES = ["Sağ", "Sol"]
+VIEWS = ["CC", "MLO"]
+
+# Aynı lezyon için CC ve MLO'daki meme başı uzaklığı farkı toleransı (cm)
+DISTANCE_TOLERANCE_CM = 1.5
+# Her CC bulgusu için değerlendirilen en yakın MLO aday sayısı
+MAX_CANDIDATES = 4
+# Farklı bulgu tiplerinin aynı lezyon sayılması için saat kadranı farkı toleransı
+SAME_LESION_CLOCK_H = 1.0
+
+# Bulgu tipine ait form alanları; bir lezyon yalnızca kendi tipinin alanlarını alır
+FEATURE_FIELDS = {
+    "Kitle": ("shape", "margin", "stable_2yr"),
+    "Kalsifikasyon": ("calc_morph", "calc_dist"),
+    "Architectural Distortion": ("prev_surgery",),
+    "Asimetri": ("asym_type",),
+}
+
+
+def make_finding(finding, side, view, clock, distance_cm, finding_id=None):
+    if side not in SIDES:
+        raise ValueError(f"Geçersiz taraf: {side}")
+    if view not in VIEWS:
+        raise ValueError(f"Geçersiz görünüm: {view}")
+    if not 0 < clock <= 12:
+        raise ValueError(f"Saat kadranı 1–12 arasında olmalı: {clock}")
+    if distance_cm < 0:
+        raise ValueError(f"Meme başına uzaklık negatif olamaz: {distance_cm}")
+    return {
+        "id": finding_id,
+        "finding": finding,
+        "side": side,
+        "view": view,
+        "clock": float(clock),
+        "distance_cm": float(distance_cm),
+    }
+
+
+def quadrant(side, clock, distance_cm=None):
+    # Hastaya bakan gözlemci konvansiyonu: sağ memede dış kadranlar 6–12 (9 yönü),
+    # sol memede 12–6 (3 yönü)
+    if distance_cm is not None and distance_cm < 1:
+        return "Retroareolar"
+    angle = (clock % 12) * 30.0
+    upper = angle <= 90 or angle >= 270
+    outer = angle >= 180 if side == "Sağ" else angle <= 180
+    if angle in (0.0, 180.0):
+        return ("Üst" if upper else "Alt") + " orta hat"
+    if angle in (90.0, 270.0):
+        return ("Dış" if outer else "İç") + " orta hat"
+    return ("Üst " if upper else "Alt ") + ("dış" if outer else "iç")
+
+
+def depth(distance_cm, pnl_cm=None):
+    # Posterior nipple line verilmişse üçte birlere, yoksa 12 cm referansa göre
+    third = (pnl_cm if pnl_cm else 12.0) / 3.0
+    if distance_cm <= third:
+        return "Ön"
+    if distance_cm <= 2 * third:
+        return "Orta"
+    return "Arka"
+
+
+def _clock_difference(a, b):
+    d = abs(a - b) % 12
+    return min(d, 12 - d)
+
+
+def _circular_mean_clock(clocks):
+    x = sum(math.cos(c * math.pi / 6) for c in clocks)
+    y = sum(math.sin(c * math.pi / 6) for c in clocks)
+    c = (math.atan2(y, x) * 6 / math.pi) % 12
+    return round(c * 2) / 2 or 12.0
+
+
+def match_views(findings, tolerance_cm=DISTANCE_TOLERANCE_CM):
+    """CC ve MLO bulgularını eşleştirir; (eşleşen çiftler, tek projeksiyon bulguları) döner."""
+    groups = {}
+    for f in findings:
+        groups.setdefault((f["side"], f["finding"]), {"CC": [], "MLO": []})[f["view"]].append(f)
+
+    pairs = []
+    singles = []
+    for group in groups.values():
+        cc = group["CC"]
+        mlo = sorted(group["MLO"], key=lambda f: f["distance_cm"])
+        mlo_dist = [f["distance_cm"] for f in mlo]
+
+        # Tolerans penceresindeki en yakın adaylar (ikili arama, sonra iki yöne genişleme)
+        candidates = []
+        for i, c in enumerate(cc):
+            d = c["distance_cm"]
+            lo = bisect_left(mlo_dist, d - tolerance_cm)
+            hi = bisect_right(mlo_dist, d + tolerance_cm)
+            left = bisect_left(mlo_dist, d, lo, hi) - 1
+            right = left + 1
+            nearest = []
+            while len(nearest) < MAX_CANDIDATES and (left >= lo or right < hi):
+                if right >= hi or (left >= lo and d - mlo_dist[left] <= mlo_dist[right] - d):
+                    nearest.append(left)
+                    left -= 1
+                else:
+                    nearest.append(right)
+                    right += 1
+            for j in nearest:
+                cost = (abs(c["distance_cm"] - mlo_dist[j]) / tolerance_cm
+                        + _clock_difference(c["clock"], mlo[j]["clock"]) / 6.0)
+                candidates.append((cost, i, j))
+
+        # En düşük maliyetli çiftten başlayarak açgözlü atama
+        candidates.sort()
+        used_cc = set()
+        used_mlo = set()
+        for cost, i, j in candidates:
+            if i in used_cc or j in used_mlo:
+                continue
+            used_cc.add(i)
+            used_mlo.add(j)
+            pairs.append((cc[i], mlo[j]))
+
+        singles.extend(c for i, c in enumerate(cc) if i not in used_cc)
+        singles.extend(m for j, m in enumerate(mlo) if j not in used_mlo)
+    return pairs, singles
+
+
+def build_lesions(findings, tolerance_cm=DISTANCE_TOLERANCE_CM, pnl_cm=None):
+    pairs, singles = match_views(findings, tolerance_cm)
+    lesions = []
+    for views in [list(p) for p in pairs] + [[s] for s in singles]:
+        first = views[0]
+        clock = _circular_mean_clock([v["clock"] for v in views])
+        distance_cm = sum(v["distance_cm"] for v in views) / len(views)
+        lesions.append({
+            "finding": first["finding"],
+            "side": first["side"],
+            "cc": next((v for v in views if v["view"] == "CC"), None),
+            "mlo": next((v for v in views if v["view"] == "MLO"), None),
+            "clock": clock,
+            "distance_cm": round(distance_cm, 1),
+            "quadrant": quadrant(first["side"], clock, distance_cm),
+            "depth": depth(distance_cm, pnl_cm),
+            "two_view": len(views) == 2,
+        })
+    lesions.sort(key=lambda l: (l["side"], l["finding"], l["distance_cm"]))
+    return lesions
+
+
+def _same_lesion(a, b, tolerance_cm=DISTANCE_TOLERANCE_CM):
+    # Aynı tarafta, meme başına uzaklık ve saat kadranı örtüşen iki lezyon
+    return (a["side"] == b["side"]
+            and abs(a["distance_cm"] - b["distance_cm"]) <= tolerance_cm
+            and _clock_difference(a["clock"], b["clock"]) <= SAME_LESION_CLOCK_H)
+
+
+def lesion_inputs(lesion, lesions, form):
+    """Lezyonun sınıflandırma girdileri: formdan yalnızca kendi bulgu tipinin özellikleri alınır.
+
+    Kitle özellikleri (şekil/kenar) mimari distorsiyona yalnızca aynı tarafta
+    aynı konumdaki bir kitle lezyonu varsa (aynı lezyon) aktarılır.
+    """
+    finding = lesion["finding"]
+    other = {f for t, fields in FEATURE_FIELDS.items() if t != finding for f in fields}
+    inputs = {k: v for k, v in form.items() if k not in other}
+    inputs["finding_type"] = [finding]
+    if finding == "Architectural Distortion":
+        masses = [l for l in lesions if l["finding"] == "Kitle" and _same_lesion(lesion, l)]
+        if masses:
+            inputs["finding_type"] = ["Kitle", finding]
+            inputs.update({f: form[f] for f in FEATURE_FIELDS["Kitle"] if f in form})
+    return inputs
+
+
+def classify_lesions(lesions, **form):
+    """Her lezyonu mevcut kategori mantığından geçirir ve en şüpheli kategoriyi döner.
+
+    Tek projeksiyonda kalan asimetri "Tek Projeksiyon" (BI-RADS 0) olarak,
+    iki projeksiyonda doğrulanan asimetri ise en az "Fokal" olarak değerlendirilir.
+    """
+    results = []
+    for lesion in lesions:
+        inputs = lesion_inputs(lesion, lesions, form)
+        note = ""
+        if lesion["finding"] == "Asimetri":
+            if not lesion["two_view"]:
+                inputs["asym_type"] = "Tek Projeksiyon"
+            elif form.get("asym_type") in (None, "Tek Projeksiyon"):
+                inputs["asym_type"] = "Fokal"
+                note = "İki projeksiyonda doğrulanan asimetri tek projeksiyon asimetrisi değildir."
+        elif not lesion["two_view"]:
+            note = "Bulgu tek projeksiyonda izlendi; ortogonal projeksiyonda doğrulanmalı."
+        result = classify(**inputs)
+        result["extra_note"] = note or result["extra_note"]
+        results.append(result)
+    # Formda özellikleri girilmemiş bulgu tipleri kategori üretmez
+    categories = [r["category"] for r in results if r["category"]]
+    category = highest_category(categories) if categories else None
+    return results, category
+
+
+def reconcile(result, form, lesions, lesion_results, category):
+    """Kart, kayıt ve dışa aktarımda kullanılacak sonucu seçer.
+
+    Formdaki tüm bulgu tipleri lokalize edildiyse lezyon bazlı sonuç esas alınır;
+    bazıları edilmediyse form ve lezyon sonuçlarından daha şüpheli olanı seçilir.
+    """
+    if category is None or category == result["category"]:
+        return result
+    covered = set(form.get("finding_type", ())) <= {l["finding"] for l in lesions}
+    if covered:
+        reason = "tüm bulgular lokalize edildiği için"
+    elif result["category"] and suspicion_rank(result["category"]) >= suspicion_rank(category):
+        return result
+    else:
+        reason = "form sonucundan daha şüpheli olduğu için"
+    merged = dict(next(r for r in lesion_results if r["category"] == category))
+    note = f"Sonuç lezyon bazında değerlendirmeden ({category}) alındı; {reason} form sonucu ({result['category'] or '-'}) yerine geçti."
+    merged["extra_note"] = note + (f" {merged['extra_note']}" if merged["extra_note"] else "")
+    return merged
@@ -0,0 +1,265 @@
+# --- Kısa yazım (dikte benzeri) girişi ---
+# Hızlı okuyucular için tek satırlık kısaltma girişi:
+#
+#     M OV CIRC STB; C AMO SEG; AD PREVSURG
+#
+# ";" ile ayrılan her bölüm bir bulgu kodu (M kitle, C kalsifikasyon,
+# AD mimari distorsiyon, A asimetri) ve o bulgunun özellik kısaltmalarından
+# oluşur; STB, PREVSURG, SKINR, NIPR, INC her bölümde kullanılabilir. Kısaltmalar
+# bağlama göre önceden derlenmiş trie'lerde aranır: tam eşleşme veya tek bir
+# kısaltmaya giden önek kabul edilir ("SP" -> SPIC), tamamlamalar her düğümde
+# hazır tutulur. Ayrıştırma bir satır için mikrosaniyeler sürer; aynı fonksiyon
+# toplu metin (satır başına bir vaka) için de kullanılır.
+
+import re
+
+import pandas as pd
+
+from birads_rules import FINDING_TYPES, SHAPES, margin_options, calc_dist_options, classify
+
+SEGMENT_CODES = {"M": "Kitle", "C": "Kalsifikasyon", "AD": "Architectural Distortion", "A": "Asimetri"}
+
+# Kısaltma -> sırayla denenen (alan, değer) adayları; ilk boş alan doldurulur
+# (ör. kitlede ilk IRR şekil, ikincisi kenar)
+FINDING_TOKENS = {
+    "Kitle": {
+        "RND": [("shape", "Yuvarlak")],
+        "OV": [("shape", "Oval")],
+        "IRR": [("shape", "Düzensiz"), ("margin", "Düzensiz")],
+        "CIRC": [("margin", "Düzgün")],
+        "MIC": [("margin", "Mikrolobüle")],
+        "IND": [("margin", "Düzensiz")],
+        "SPIC": [("margin", "Spiküle")],
+    },
+    "Kalsifikasyon": {
+        "AMO": [("calc_morph", "Amorf")],
+        "PLEO": [("calc_morph", "Pleomorfik")],
+        "LB": [("calc_morph", "Lineer/Dallanan")],
+        "PUNC": [("calc_morph", "Round/Punctate")],
+        "POP": [("calc_morph", "Coarse/Popcorn")],
+        "RIM": [("calc_morph", "Eggshell/Rim")],
+        "MOC": [("calc_morph", "Milk of Calcium")],
+        "SKIN": [("calc_morph", "Skin")],
+        "VASC": [("calc_morph", "Vascular")],
+        "GRP": [("calc_dist", "Gruplu")],
+        "SEG": [("calc_dist", "Segmental")],
+        "LIN": [("calc_dist", "Lineer")],
+        "DIF": [("calc_dist", "Diffüz")],
+    },
+    "Architectural Distortion": {},
+    "Asimetri": {
+        "ONE": [("asym_type", "Tek Projeksiyon")],
+        "FOC": [("asym_type", "Fokal")],
+        "DEV": [("asym_type", "Gelişen")],
+        "GLOB": [("asym_type", "Global")],
+        "DENS": [("asym_type", "Sadece Yoğunluk Farkı")],
+    },
+}
+GLOBAL_TOKENS = {
+    "STB": [("stable_2yr", True)],
+    "PREVSURG": [("prev_surgery", "Evet")],
+    "SKINR": [("skin_retraction", True)],
+    "NIPR": [("nipple_retraction", True)],
+    "INC": [("exam_complete", "Hayır")],
+}
+
+DEFAULT_INPUTS = {
+    "exam_complete": "Evet", "finding_type": [], "shape": None, "margin": None, "stable_2yr": False,
+    "calc_morph": None, "calc_dist": None, "asym_type": None, "prev_surgery": "Hayır",
+    "skin_retraction": False, "nipple_retraction": False,
+}
+
+
+class _Node:
+    __slots__ = ("children", "token", "completions")
+
+    def __init__(self):
+        self.children = {}
+        self.token = None
+        self.completions = ()
+
+
+def build_trie(tokens):
+    """Kısaltmalardan trie kurar; her düğümde altındaki kısaltmalar sıralı tutulur."""
+    root = _Node()
+    for token in tokens:
+        node = root
+        for ch in token:
+            node = node.children.setdefault(ch, _Node())
+        node.token = token
+
+    def finish(node):
+        below = [node.token] if node.token else []
+        for child in node.children.values():
+            below.extend(finish(child))
+        node.completions = tuple(sorted(below))
+        return node.completions
+
+    finish(root)
+    return root
+
+
+def _walk(root, word):
+    node = root
+    for ch in word:
+        node = node.children.get(ch)
+        if node is None:
+            return None
+    return node
+
+
+def resolve(root, word):
+    """(kısaltma, adaylar): tam eşleşme veya tekil önek; yoksa kısaltma None."""
+    node = _walk(root, word)
+    if node is None:
+        return None, ()
+    if node.token:
+        return node.token, node.completions
+    if len(node.completions) == 1:
+        return node.completions[0], node.completions
+    return None, node.completions
+
+
+# Bağlam başına derlenmiş tablolar: bölüm başı (kod + genel), her bulgu (özellik + genel)
+SEGMENT_START = build_trie(list(SEGMENT_CODES) + list(GLOBAL_TOKENS))
+CONTEXTS = {
+    finding: (dict(tokens, **GLOBAL_TOKENS), build_trie(list(tokens) + list(GLOBAL_TOKENS)))
+    for finding, tokens in FINDING_TOKENS.items()
+}
+CONTEXTS[None] = (GLOBAL_TOKENS, build_trie(GLOBAL_TOKENS))
+
+_SPLIT = re.compile(r"[\s,]+")
+
+
+def _assign(inputs, given, candidates, token, errors):
+    # Dolu alan atlanır (ikinci IRR kenara gider); tüm adaylar doluysa tekrar bildirilir
+    for field, value in candidates:
+        if field not in given:
+            inputs[field] = value
+            given[field] = token
+            return
+    field = candidates[-1][0]
+    errors.append(f"{token}: '{field}' zaten {given[field]} ile verildi")
+
+
+def parse(text):
+    """Kısa yazımı form girdilerine çevirir.
+
+    Dönen sözlük: inputs (classify argümanları), errors, missing (formda
+    sorulacak ama verilmemiş alanlar) ve completions (yazılmakta olan son
+    kısaltmanın tamamlamaları).
+    """
+    inputs = dict(DEFAULT_INPUTS, finding_type=[])
+    given = {}
+    errors = []
+    completions = ()
+    segments = text.upper().split(";")
+    for s, segment in enumerate(segments):
+        words = [w for w in _SPLIT.split(segment) if w]
+        last_open = s == len(segments) - 1 and words and not segment[-1:].isspace()
+        table, trie = CONTEXTS[None]
+        for i, word in enumerate(words):
+            partial = last_open and i == len(words) - 1
+            token, candidates = resolve(SEGMENT_START if i == 0 else trie, word)
+            if i == 0 and word in SEGMENT_CODES:
+                token = word  # "A" tam eşleşmesi "AD" önekine tercih edilir
+            if partial:
+                completions = candidates
+            if token is None:
+                if not candidates:
+                    errors.append(f"{word}: tanınmayan kısaltma")
+                elif not partial:
+                    errors.append(f"{word}: belirsiz ({', '.join(candidates)})")
+                continue
+            if i == 0 and token in SEGMENT_CODES:
+                finding = SEGMENT_CODES[token]
+                table, trie = CONTEXTS[finding]
+                if finding in inputs["finding_type"]:
+                    errors.append(f"{token}: bulgu tekrar edildi")
+                else:
+                    inputs["finding_type"].append(finding)
+                continue
+            _assign(inputs, given, table[token], token, errors)
+        if s == len(segments) - 1 and not last_open:
+            # Boşlukla biten girişte bağlamdaki sıradaki kısaltmalar önerilir (dolu alanlar hariç)
+            completions = [t for t in (trie if words else SEGMENT_START).completions
+                           if t in SEGMENT_CODES or any(f not in given for f, _ in table.get(t, GLOBAL_TOKENS.get(t, ())))]
+
+    inputs["finding_type"].sort(key=FINDING_TYPES.index)
+    errors.extend(_check(inputs))
+    return {
+        "inputs": inputs,
+        "errors": errors,
+        "missing": _missing(inputs),
+        "completions": list(completions),
+    }
+
+
+def _check(inputs):
+    # Formda seçilemeyecek birleşimler (şekle göre kenar, morfolojiye göre dağılım)
+    errors = []
+    if inputs["margin"] and not inputs["shape"]:
+        # Şekil verilmezse form varsayılanı (Yuvarlak) geçerlidir; yalnızca düzensiz kitlede
+        # seçilebilen kenar (SPIC, IND) düzensiz şekli gerektirir
+        if inputs["margin"] not in margin_options(SHAPES[0]):
+            inputs["shape"] = "Düzensiz"
+    if inputs["margin"] and inputs["margin"] not in margin_options(inputs["shape"] or SHAPES[0]):
+        errors.append(f"{inputs['shape']} kitlede '{inputs['margin']}' kenar seçilemez")
+        inputs["margin"] = None
+    if inputs["calc_morph"] and inputs["calc_dist"] and inputs["calc_dist"] not in calc_dist_options(inputs["calc_morph"]):
+        errors.append(f"{inputs['calc_morph']} morfolojide '{inputs['calc_dist']}' dağılım seçilemez")
+        inputs["calc_dist"] = None
+    return errors
+
+
+def _missing(inputs):
+    if inputs["exam_complete"] == "Hayır":
+        return []
+    finding_type = inputs["finding_type"]
+    missing = []
+    if "Kitle" in finding_type:
+        missing += [f for f in ("shape", "margin") if inputs[f] is None]
+    if "Kalsifikasyon" in finding_type:
+        if inputs["calc_morph"] is None:
+            missing.append("calc_morph")
+        elif calc_dist_options(inputs["calc_morph"]) and inputs["calc_dist"] is None:
+            missing.append("calc_dist")
+    if "Asimetri" in finding_type and inputs["asym_type"] is None:
+        missing.append("asym_type")
+    return missing
+
+
+def complete(text):
+    """Yazılmakta olan son kısaltmanın tamamlamaları."""
+    return parse(text)["completions"]
+
+
+_CASE_PREFIX = re.compile(r"^\s*([^:;]+?)\s*:\s*(.*)$")
+
+
+def parse_bulk(text):
+    """Satır başına bir vaka ("VAKA-NO: kısa yazım" veya yalnızca kısa yazım); sınıflandırılmış tablo döner."""
+    rows = []
+    results = {}
+    for line_no, line in enumerate(text.splitlines(), 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = _CASE_PREFIX.match(line)
+        case_id, shorthand = (match.group(1), match.group(2)) if match else ("", line.strip())
+        parsed = parse(shorthand)
+        inputs = parsed["inputs"]
+        # Aynı girdiler bir kez sınıflandırılır
+        key = repr(sorted(inputs.items()))
+        if key not in results:
+            results[key] = classify(**inputs)
+        result = results[key]
+        rows.append({
+            "line": line_no,
+            "case_id": case_id,
+            "shorthand": shorthand.strip(),
+            "category": result["category"],
+            "management": result["management"],
+            "errors": "; ".join(parsed["errors"] + [f"eksik: {f}" for f in parsed["missing"]]),
+            "inputs": inputs,
+        })
+    return pd.DataFrame(rows, columns=["line", "case_id", "shorthand", "category", "management", "errors", "inputs"])
@@ -0,0 +1,140 @@
+# --- Form durumunun anlık kaydı ve geri yüklenmesi ---
+# Bağlantı koptuğunda veya sunucu yeniden başladığında okuyucunun yarım kalan
+# girişleri kaybolmasın diye form durumu her değişiklikte veri klasörüne
+# küçük bir JSON olarak yazılır. Yazma arka plan iş parçacığında yapılır;
+# aynı oturumun bekleyen eski kaydı yenisiyle değiştirilir (en son durum
+# kazanır). Geri yüklerken her değer birads_rules seçenekleriyle doğrulanır,
+# böylece geçersiz bir değer widget'a ulaşmaz.
+
+import atexit
+import json
+import os
+import secrets
+import threading
+import time
+
+from birads_history import data_path
+from birads_rules import FINDING_TYPES, SHAPES, CALC_MORPHS, ASYM_TYPES, margin_options, calc_dist_options
+
+SNAPSHOT_DIR = "snapshots"
+# Bu süreden eski kayıtlar yazıcı başlarken silinir
+SNAPSHOT_TTL_DAYS = 7
+
+# Widget anahtarı -> geçerli değer denetimi (form sözlüğünün tamamını alır)
+FORM_FIELDS = {
+    "exam_complete": lambda v, f: v in ("Evet", "Hayır"),
+    "finding_type": lambda v, f: isinstance(v, list) and all(t in FINDING_TYPES for t in v),
+    "shape": lambda v, f: v in SHAPES,
+    "margin": lambda v, f: f.get("shape") in SHAPES and v in margin_options(f["shape"]),
+    "calc_morph": lambda v, f: v in CALC_MORPHS,
+    "calc_dist": lambda v, f: f.get("calc_morph") in CALC_MORPHS and v in calc_dist_options(f["calc_morph"]),
+    "asym_type": lambda v, f: v in ASYM_TYPES,
+    "prev_surgery": lambda v, f: v in ("Hayır", "Evet"),
+    "skin_retraction": lambda v, f: isinstance(v, bool),
+    "nipple_retraction": lambda v, f: isinstance(v, bool),
+    "stable_2yr_main": lambda v, f: isinstance(v, bool),
+    "stable_2yr_combined": lambda v, f: isinstance(v, bool),
+    "combined_done": lambda v, f: isinstance(v, bool),
+    "case_id": lambda v, f: isinstance(v, str) and len(v) <= 200,
+    "reader": lambda v, f: isinstance(v, str) and len(v) <= 200,
+    "shorthand": lambda v, f: isinstance(v, str) and len(v) <= 500,
+}
+
+
+def new_token():
+    return secrets.token_urlsafe(9)
+
+
+def _folder():
+    folder = data_path(SNAPSHOT_DIR)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def _path(token):
+    # Belirteç URL'den gelir; dosya adına yalnızca güvenli karakterler geçer
+    safe = "".join(c for c in token if c.isalnum() or c in "-_")[:32]
+    if not safe:
+        raise ValueError("Geçersiz oturum belirteci")
+    return os.path.join(_folder(), safe + ".json")
+
+
+def encode(form):
+    return json.dumps(form, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def validate(form):
+    """Yalnızca tanınan ve geçerli alanları döner."""
+    return {k: v for k, v in form.items() if k in FORM_FIELDS and FORM_FIELDS[k](v, form)}
+
+
+def load_snapshot(token):
+    try:
+        with open(_path(token), "rb") as f:
+            form = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return validate(form) if isinstance(form, dict) else {}
+
+
+class SnapshotWriter:
+    """Arka plan yazıcısı: belirteç başına yalnızca en son form durumu diske yazılır."""
+
+    def __init__(self):
+        self.pending = {}
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def submit(self, token, form):
+        path = _path(token)
+        with self.cond:
+            self.pending[path] = encode(form)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="birads-snapshot", daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+            self.cond.notify()
+
+    def _run(self):
+        prune(SNAPSHOT_TTL_DAYS)
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                batch, self.pending = self.pending, {}
+            self._write(batch)
+
+    def flush(self):
+        with self.cond:
+            batch, self.pending = self.pending, {}
+        self._write(batch)
+
+    @staticmethod
+    def _write(batch):
+        for path, payload in batch.items():
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+            except OSError:
+                pass  # Anlık kayıt en iyi çabadır; form çalışmaya devam eder
+
+
+WRITER = SnapshotWriter()
+
+
+def save_snapshot(token, form):
+    WRITER.submit(token, {k: v for k, v in form.items() if k in FORM_FIELDS})
+
+
+def prune(days):
+    folder = _folder()
+    limit = time.time() - days * 86400
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+        except OSError:
+            pass
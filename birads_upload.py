@@ -0,0 +1,226 @@
+# --- Görüntü yükleme hattı (akışlı, bellek sınırlı) ---
+# Yüklenen dosya parça parça geçici dosyaya yazılır (aynı döngüde içerik özeti
+# hesaplanır), ardından tek geçişte çözülür: üst veri (EXIF, PNG metin
+# parçaları, TIFF etiketleri, ICC) atılır, yalnızca piksel verisi .npy olarak
+# diske yazılır ve aynı dizi ekran boyutuna bir kez küçültülür. Ham dosya hemen
+# silinir; analizler pikselleri bellek eşlemli (mmap) okur, oturum belleğinde
+# yalnızca küçük önizleme tutulur. Kayıtlar bayt sınırlı LRU önbellekte
+# saklanır: bir oturum SESSION_CAP_BYTES'ı aşınca kendi en eski kaydı, süreç
+# toplamı GLOBAL_CAP_BYTES'ı aşınca tüm oturumların en eski kaydı atılır; atılan
+# kaydın piksel dosyası da silinir. Biten oturumların kayıtları ayrıca
+# temizlenmez, süreç sınırı altında LRU ile atılır (kalanlar süreç çıkışında
+# silinir).
+#
+# Not: Görüntüye gömülü (burned-in) hasta bilgisi piksel verisindedir ve silinmez.
+
+import atexit
+from collections import OrderedDict
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+CHUNK_SIZE = 1 << 20
+# Önizleme en uzun kenarı (piksel)
+DISPLAY_MAX_SIDE = 1024
+# Önbellek sınırları: önizleme + mmap ile okunan piksel dosyası baytları sayılır
+SESSION_CAP_BYTES = 128 << 20
+GLOBAL_CAP_BYTES = 1 << 30
+
+# Kimlik bilgisi taşıyabilen TIFF etiketleri (yapısal etiketler piksel verisiyle birlikte zaten atılır)
+TIFF_TEXT_TAGS = {
+    269: "DocumentName", 270: "ImageDescription", 271: "Make", 272: "Model", 285: "PageName",
+    305: "Software", 306: "DateTime", 315: "Artist", 316: "HostComputer", 33432: "Copyright",
+}
+
+UPLOAD_DIR = tempfile.mkdtemp(prefix="birads_upload_")
+atexit.register(shutil.rmtree, UPLOAD_DIR, True)
+
+
+def stage_upload(file):
+    """Yüklemeyi parça parça geçici dosyaya yazar; (içerik anahtarı, dosya yolu) döner."""
+    digest = hashlib.sha256()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    fd, path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".upload")
+    with os.fdopen(fd, "wb") as out:
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()[:32], path
+
+
+def _metadata_keys(image):
+    keys = set(image.info)
+    tags = getattr(image, "tag_v2", None)
+    if tags:
+        keys.update(name for tag, name in TIFF_TEXT_TAGS.items() if tag in tags)
+    return sorted(keys)
+
+
+def _to_pixels(image):
+    # Tek kanallı uint8/uint16 dizi: 16-bit korunur, diğerleri gri tona çevrilir
+    if image.mode in ("I;16", "I;16B", "I;16L"):
+        return np.asarray(image, dtype=np.uint16)
+    if image.mode in ("I", "F"):
+        return np.clip(np.asarray(image), 0, 65535).astype(np.uint16)
+    if image.mode != "L":
+        image = image.convert("L")
+    return np.asarray(image)
+
+
+def display_image(pixels, max_side=DISPLAY_MAX_SIDE):
+    """Ekran için 8-bit önizleme: adımlı örnekleme + yüzdelik pencereleme + son yeniden boyutlandırma."""
+    step = max(1, max(pixels.shape) // (2 * max_side))
+    view = pixels[::step, ::step]
+    lo, hi = np.percentile(view, [0.5, 99.5])
+    scaled = (np.clip(view, lo, hi) - lo) * (255.0 / max(hi - lo, 1))
+    preview = Image.fromarray(scaled.astype(np.uint8), mode="L")
+    ratio = max_side / max(pixels.shape)
+    if ratio < 1:
+        size = (max(1, round(pixels.shape[1] * ratio)), max(1, round(pixels.shape[0] * ratio)))
+        preview = preview.resize(size, Image.BILINEAR)
+    return preview
+
+
+def _reduction(image, max_pixels):
+    if not max_pixels:
+        return 1
+    return max(1, int(np.ceil(np.sqrt(image.width * image.height / max_pixels))))
+
+
+def decode_upload(key, raw_path, max_pixels=None):
+    """Ham dosyayı tek geçişte çözer, üst veriyi atar, pikselleri .npy'ye yazar ve ham dosyayı siler.
+
+    max_pixels verilirse görüntü çözülürken küçültülür: JPEG'de DCT ölçekli
+    "draft" kipi, 8-bit görüntülerde Image.reduce; 16-bit için adımlı örnekleme.
+    """
+    npy_path = os.path.join(UPLOAD_DIR, key + ".npy")
+    try:
+        with Image.open(raw_path) as image:
+            removed = _metadata_keys(image)
+            factor = _reduction(image, max_pixels)
+            if factor > 1 and image.format == "JPEG":
+                image.draft(image.mode, (image.width // factor, image.height // factor))
+                factor = _reduction(image, max_pixels)
+            if factor > 1 and image.mode in ("L", "RGB", "RGBA"):
+                image = image.reduce(factor)
+                factor = 1
+            pixels = _to_pixels(image)
+    finally:
+        os.remove(raw_path)
+    if factor > 1:
+        pixels = np.ascontiguousarray(pixels[::factor, ::factor])
+    if not os.path.exists(npy_path):
+        # Aynı içeriği eşzamanlı çözen oturumlar ayrı geçici dosyaya yazar; os.replace atomiktir
+        fd, tmp = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, pixels)
+            os.replace(tmp, npy_path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    return {
+        "key": key,
+        "path": npy_path,
+        "shape": pixels.shape,
+        "dtype": str(pixels.dtype),
+        "removed_metadata": removed,
+        "display": display_image(pixels),
+    }
+
+
+def open_pixels(entry):
+    """Anonimleştirilmiş pikselleri kopyalamadan (salt okunur mmap) açar."""
+    return np.load(entry["path"], mmap_mode="r")
+
+
+class UploadCache:
+    """Oturum ve süreç bayt sınırlı LRU önbellek; biten oturumlar süreç sınırıyla atılır."""
+
+    def __init__(self, session_cap=SESSION_CAP_BYTES, global_cap=GLOBAL_CAP_BYTES):
+        self.session_cap = session_cap
+        self.global_cap = global_cap
+        self.entries = OrderedDict()  # (oturum, anahtar) -> (kayıt, bayt)
+        self.aliases = {}  # (oturum, yükleme kimliği) -> anahtar
+        self.total = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _size(entry):
+        display = entry["display"]
+        pixels = int(np.prod(entry["shape"])) * np.dtype(entry["dtype"]).itemsize
+        return display.width * display.height * len(display.getbands()) + pixels
+
+    def lookup(self, session_id, upload_id):
+        key = self.aliases.get((session_id, upload_id))
+        return self.get(session_id, key) if key else None
+
+    def get(self, session_id, key):
+        with self.lock:
+            item = self.entries.get((session_id, key))
+            if item is None:
+                return None
+            self.entries.move_to_end((session_id, key))
+            return item[0]
+
+    def put(self, session_id, entry, upload_id=None):
+        size = self._size(entry)
+        with self.lock:
+            if upload_id is not None:
+                self.aliases[(session_id, upload_id)] = entry["key"]
+            old = self.entries.pop((session_id, entry["key"]), None)
+            if old:
+                self.total -= old[1]
+            self.entries[(session_id, entry["key"])] = (entry, size)
+            self.total += size
+            used = sum(s for (sid, _), (_, s) in self.entries.items() if sid == session_id)
+            for ident in [k for k in self.entries if k[0] == session_id]:
+                if used <= self.session_cap or ident[1] == entry["key"]:
+                    break
+                used -= self._evict(ident)
+            for ident in list(self.entries):
+                if self.total <= self.global_cap or ident == (session_id, entry["key"]):
+                    break
+                self._evict(ident)
+
+    def _evict(self, ident):
+        entry, size = self.entries.pop(ident)
+        self.total -= size
+        for alias in [a for a, k in self.aliases.items() if a[0] == ident[0] and k == ident[1]]:
+            del self.aliases[alias]
+        # Aynı içerik başka oturumda hâlâ kullanılıyorsa piksel dosyası korunur
+        if not any(k[1] == ident[1] for k in self.entries):
+            try:
+                os.remove(entry["path"])
+            except OSError:
+                pass
+        return size
+
+
+CACHE = UploadCache()
+
+
+def process_upload(file, session_id, max_pixels=None, cache=CACHE):
+    """Yüklemeyi akışla diske alır, çözer ve önbelleğe koyar; aynı yükleme yeniden okunmaz."""
+    upload_id = (getattr(file, "file_id", None), max_pixels)
+    entry = cache.lookup(session_id, upload_id) if upload_id[0] else None
+    if entry is not None and os.path.exists(entry["path"]):
+        return entry
+    digest, raw_path = stage_upload(file)
+    key = f"{digest}-{max_pixels or 0}"
+    entry = cache.get(session_id, key)
+    if entry is not None and os.path.exists(entry["path"]):
+        os.remove(raw_path)
+    else:
+        entry = decode_upload(key, raw_path, max_pixels)
+    cache.put(session_id, entry, upload_id if upload_id[0] else None)
+    return entry
@@ -0,0 +1,130 @@
+# --- Biyopsi verimi ve iş yükü simülasyonu ---
+# Sınıflandırılmış bir kohortun kategori dağılımından, referans metinlerindeki
+# malignite aralıklarıyla (4A ≈%2–10, 4B ≈%10–50, 4C ≈%50–95, 5 ≥%95, 3 <%2;
+# spiküle kenar PPV >%90) beklenen kanser sayısı, kanser başına biyopsi ve
+# BI-RADS 3 takip yükü Monte Carlo ile hesaplanır. Her çekilişte her grubun
+# gerçek malignite oranı aralığından düzgün dağılımla seçilir, kanser sayısı
+# binom dağılımından çekilir. Vaka başına değil grup başına çekildiği için süre
+# kohort büyüklüğünden bağımsızdır (1 milyon vaka x 10 bin çekiliş < 1 sn).
+
+import numpy as np
+import pandas as pd
+
+from birads_rules import CATEGORIES
+
+# Kategori -> (alt, üst) malignite olasılığı
+MALIGNANCY_RANGES = {
+    "BI-RADS 1": (0.0, 0.0),
+    "BI-RADS 2": (0.0, 0.0),
+    "BI-RADS 3": (0.0, 0.02),
+    "BI-RADS 4A": (0.02, 0.10),
+    "BI-RADS 4B": (0.10, 0.50),
+    "BI-RADS 4C": (0.50, 0.95),
+    "BI-RADS 5": (0.95, 1.0),
+}
+# Spiküle kenarlı kitlelerde alt sınır yükseltilir (kategori üst sınırı korunur)
+SPICULATED_MIN = 0.90
+# Tanısal biyopsi önerilen kategoriler; BI-RADS 6 zaten kanıtlanmış kanserdir, verime katılmaz
+YIELD_BIOPSY_CATEGORIES = ["BI-RADS 4A", "BI-RADS 4B", "BI-RADS 4C", "BI-RADS 5"]
+# BI-RADS 3: 6, 12 ve 24. ay kontrolleri
+FOLLOWUP_EXAMS = 3
+
+METRIC_LABELS = {
+    "cancers": "Biyopsiyle bulunan kanser",
+    "biopsies_per_cancer": "Kanser başına biyopsi",
+    "ppv": "Biyopsi PPV'si",
+    "followup_cancers": "BI-RADS 3 takipte kanser",
+    "followup_exams": "BI-RADS 3 takip incelemesi",
+}
+
+
+def cohort_counts(categories, spiculated=None):
+    """Kategori (ve spiküle kenar) başına vaka sayısı; sütunlar: category, spiculated, n."""
+    df = pd.DataFrame({
+        "category": pd.Series(categories, dtype=object).to_numpy(),
+        "spiculated": False if spiculated is None else np.asarray(spiculated, dtype=bool),
+    })
+    unknown = sorted(set(df["category"].dropna()) - set(CATEGORIES))
+    if unknown:
+        raise ValueError(f"Tanınmayan BI-RADS kategorisi: {', '.join(map(str, unknown))}")
+    # Kategori sırası CATEGORIES ile aynı kalsın diye sıralı Categorical üzerinden gruplanır
+    df["category"] = pd.Categorical(df["category"], categories=CATEGORIES, ordered=True)
+    counts = df.groupby(["category", "spiculated"], observed=True).size().rename("n").reset_index()
+    counts["category"] = counts["category"].astype(str)
+    return counts
+
+
+def cohort_from_history(history):
+    """Geçmiş kayıtlarından vaka başına son kararı alır (vaka no yoksa her kayıt ayrı vakadır)."""
+    df = history.dropna(subset=["category"])
+    if "case_id" in df.columns:
+        has_case = df["case_id"].fillna("").astype(str) != ""
+        df = pd.concat([df[~has_case], df[has_case].drop_duplicates("case_id", keep="last")])
+    inputs = df["inputs"] if "inputs" in df.columns else pd.Series(index=df.index, dtype=object)
+    spiculated = [isinstance(i, dict) and i.get("margin") == "Spiküle" for i in inputs]
+    return cohort_counts(df["category"], spiculated)
+
+
+def group_ranges(counts):
+    lo = counts["category"].map(lambda c: MALIGNANCY_RANGES.get(c, (np.nan, np.nan))[0]).to_numpy(float)
+    hi = counts["category"].map(lambda c: MALIGNANCY_RANGES.get(c, (np.nan, np.nan))[1]).to_numpy(float)
+    lo = np.where(counts["spiculated"].to_numpy() & (hi > SPICULATED_MIN), np.maximum(lo, SPICULATED_MIN), lo)
+    return lo, hi
+
+
+def simulate(counts, draws=10000, seed=None):
+    """Her çekiliş için metrik dizileri ve kategori başına kanser sayıları döner."""
+    rng = np.random.default_rng(seed)
+    total = int(counts["n"].sum())
+    counts = counts[counts["category"].isin(MALIGNANCY_RANGES)].reset_index(drop=True)
+    n = counts["n"].to_numpy(np.int64)
+    lo, hi = group_ranges(counts)
+
+    # (çekiliş, grup) boyutlu oran ve kanser matrisleri
+    rates = lo + (hi - lo) * rng.random((draws, len(n)))
+    cancers = rng.binomial(n, rates)
+
+    biopsy = counts["category"].isin(YIELD_BIOPSY_CATEGORIES).to_numpy()
+    followup = (counts["category"] == "BI-RADS 3").to_numpy()
+    found = cancers[:, biopsy].sum(axis=1)
+    n_biopsy = int(n[biopsy].sum())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_cancer = np.where(found > 0, n_biopsy / found, np.nan)
+        ppv = found / n_biopsy if n_biopsy else np.full(draws, np.nan)
+    # Spiküle/diğer alt grupları kategori başına toplanır (grup x kategori birim matrisiyle)
+    codes, names = pd.factorize(counts["category"])
+    by_category = pd.DataFrame(cancers @ np.eye(len(names), dtype=np.int64)[codes], columns=names)
+    return {
+        "n_cases": total,
+        "n_biopsy": n_biopsy,
+        "n_followup": int(n[followup].sum()),
+        "samples": {
+            "cancers": found,
+            "biopsies_per_cancer": per_cancer,
+            "ppv": ppv,
+            "followup_cancers": cancers[:, followup].sum(axis=1),
+            "followup_exams": np.full(draws, int(n[followup].sum()) * FOLLOWUP_EXAMS),
+        },
+        "by_category": by_category,
+    }
+
+
+def _interval(values, ci):
+    tail = (100 - ci) / 2
+    values = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+    if len(values) == 0:
+        return np.nan, np.nan, np.nan
+    lower, upper = np.percentile(values, [tail, 100 - tail])
+    return float(values.mean()), float(lower), float(upper)
+
+
+def summarize(result, ci=95):
+    """Metrik başına ortalama ve yüzdelik güven aralığı tablosu."""
+    rows = [(METRIC_LABELS[k], *_interval(v, ci)) for k, v in result["samples"].items()]
+    return pd.DataFrame(rows, columns=["metric", "mean", "lower", "upper"])
+
+
+def summarize_categories(result, ci=95):
+    by_category = result["by_category"]
+    rows = [(c, *_interval(by_category[c].to_numpy(), ci)) for c in by_category.columns]
+    return pd.DataFrame(rows, columns=["category", "mean", "lower", "upper"])
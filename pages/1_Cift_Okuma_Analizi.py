@@ -0,0 +1,77 @@
+import streamlit as st
+import pandas as pd
+import os
+
+from birads_history import HISTORY_FILE, data_path, load_history
+from birads_agreement import reader_pairs, analyze
+
+st.set_page_config(
+    page_title="Radiologean - Çift Okuma Analizi",
+    page_icon="🩻",
+    layout="wide"
+)
+
+@st.cache_data(show_spinner=False)
+def cached_history(path, mtime):
+    # Dosya değişmedikçe (mtime aynı) geçmiş yeniden okunmaz
+    return load_history(path)
+
+st.title("👥 Çift Okuma Uyum Analizi")
+st.caption("İki okuyucunun aynı vakaya verdiği BI-RADS kategorileri: kappa, karışıklık matrisi ve uyumsuz vakalar.")
+
+# --- Veri kaynağı ---
+source = st.radio("Veri kaynağı", ["Sınıflandırma geçmişi", "CSV yükle"], horizontal=True)
+if source == "Sınıflandırma geçmişi":
+    path = data_path(HISTORY_FILE)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0
+    pairs = reader_pairs(cached_history(path, mtime))
+else:
+    uploaded = st.file_uploader(
+        "CSV: case_id, reader, category (okuma başına bir satır) veya case_id, category_a, category_b",
+        type="csv",
+    )
+    if uploaded is None:
+        st.stop()
+    df = pd.read_csv(uploaded, dtype=str)
+    if {"category_a", "category_b"} <= set(df.columns):
+        pairs = df
+    else:
+        if "time" not in df.columns:
+            df["time"] = range(len(df))
+        pairs = reader_pairs(df)
+
+if pairs.empty:
+    st.info("Henüz iki farklı okuyucu tarafından kaydedilmiş vaka yok.")
+    st.stop()
+
+try:
+    res = analyze(pairs)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+
+# --- Özet ---
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("Vaka çifti", f"{res['n_pairs']:,}")
+col2.metric("Tam uyum", f"{res['agreement']:.1%}")
+col3.metric("Cohen κ", f"{res['kappa']:.3f}")
+col4.metric("Lineer ağırlıklı κ", f"{res['kappa_linear']:.3f}")
+col5.metric("Kuadratik ağırlıklı κ", f"{res['kappa_quadratic']:.3f}")
+st.caption("Ağırlıklı κ ve uyumsuzluk adımı şüphe sırasına göre: 1 < 2 < 3 < 0 < 4A < 4B < 4C < 5 < 6 "
+           "(BI-RADS 0 ek değerlendirme gerektirdiği için 3 ile 4A arasında sayılır).")
+
+# --- Karışıklık matrisi ---
+st.subheader("Karışıklık matrisi (satır: okuyucu A, sütun: okuyucu B)")
+st.dataframe(res["confusion"], use_container_width=True)
+
+# --- Uyumsuz vakalar ---
+discordant = res["discordant"]
+st.subheader(f"Uyumsuz vakalar ({len(discordant):,})")
+st.caption("Yönetim farkı: okuyuculardan yalnızca biri 4A ve üzeri (biyopsi) kategori vermiş.")
+st.dataframe(discordant.head(1000), hide_index=True, use_container_width=True)
+st.download_button(
+    "Tüm uyumsuz vakaları indir (CSV)",
+    discordant.to_csv(index=False).encode("utf-8"),
+    file_name="uyumsuz_vakalar.csv",
+    mime="text/csv",
+)
@@ -0,0 +1,97 @@
+import streamlit as st
+import pandas as pd
+import os
+
+from birads_history import HISTORY_FILE, data_path, load_history
+from birads_rules import CATEGORIES
+from birads_yield import FOLLOWUP_EXAMS, cohort_counts, cohort_from_history, simulate, summarize, summarize_categories
+
+st.set_page_config(
+    page_title="Radiologean - Biyopsi Verimi",
+    page_icon="🩻",
+    layout="wide"
+)
+
+@st.cache_data(show_spinner=False)
+def cached_cohort(path, mtime):
+    # Dosya değişmedikçe (mtime aynı) geçmiş yeniden okunmaz
+    return cohort_from_history(load_history(path))
+
+st.title("🎯 Biyopsi Verimi ve İş Yükü Simülasyonu")
+st.caption(
+    "Kategori malignite aralıklarıyla (4A %2–10, 4B %10–50, 4C %50–95, 5 ≥%95, 3 <%2; spiküle kenar ≥%90) "
+    "Monte Carlo: beklenen kanser, kanser başına biyopsi ve BI-RADS 3 takip yükü."
+)
+
+# --- Kohort ---
+source = st.radio("Kohort", ["Sınıflandırma geçmişi", "CSV yükle", "Elle gir"], horizontal=True)
+if source == "Sınıflandırma geçmişi":
+    path = data_path(HISTORY_FILE)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0
+    counts = cached_cohort(path, mtime)
+elif source == "CSV yükle":
+    uploaded = st.file_uploader("CSV: category (vaka başına bir satır), isteğe bağlı margin", type="csv")
+    if uploaded is None:
+        st.stop()
+    df = pd.read_csv(uploaded, dtype=str)
+    if "category" not in df.columns:
+        st.error("CSV'de 'category' sütunu yok.")
+        st.stop()
+    try:
+        counts = cohort_counts(df["category"], df["margin"].eq("Spiküle") if "margin" in df.columns else None)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+else:
+    # Planlama için kategori başına beklenen vaka sayısı
+    planned = st.data_editor(
+        pd.DataFrame({"category": CATEGORIES, "n": 0, "spiculated": 0}),
+        column_config={
+            "category": st.column_config.TextColumn("Kategori", disabled=True),
+            "n": st.column_config.NumberColumn("Vaka", min_value=0, step=1),
+            "spiculated": st.column_config.NumberColumn("Bunlardan spiküle", min_value=0, step=1),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+    planned = planned.fillna(0)
+    spiculated = planned["spiculated"].clip(upper=planned["n"]).astype(int)
+    counts = pd.concat([
+        pd.DataFrame({"category": planned["category"], "spiculated": False, "n": planned["n"].astype(int) - spiculated}),
+        pd.DataFrame({"category": planned["category"], "spiculated": True, "n": spiculated}),
+    ])
+    counts = counts[counts["n"] > 0]
+
+if counts.empty or counts["n"].sum() == 0:
+    st.info("Kohortta vaka yok.")
+    st.stop()
+
+col1, col2, col3 = st.columns(3)
+draws = col1.number_input("Çekiliş sayısı", min_value=100, max_value=100000, value=10000, step=1000)
+ci = col2.select_slider("Güven aralığı (%)", options=[80, 90, 95, 99], value=95)
+seed = col3.number_input("Tohum (tekrarlanabilirlik)", min_value=0, value=0, step=1)
+
+res = simulate(counts, draws=int(draws), seed=int(seed))
+summary = summarize(res, ci).set_index("metric")
+
+# --- Özet ---
+def interval(metric, fmt):
+    row = summary.loc[metric]
+    return f"{fmt.format(row['lower'])} – {fmt.format(row['upper'])}"
+
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("Vaka", f"{res['n_cases']:,}")
+col2.metric("Biyopsi (4A–5)", f"{res['n_biopsy']:,}")
+col3.metric("Beklenen kanser", f"{summary.loc['Biyopsiyle bulunan kanser', 'mean']:,.0f}",
+            help=f"%{ci} aralık: {interval('Biyopsiyle bulunan kanser', '{:,.0f}')}")
+col4.metric("Kanser başına biyopsi", f"{summary.loc['Kanser başına biyopsi', 'mean']:.2f}",
+            help=f"%{ci} aralık: {interval('Kanser başına biyopsi', '{:.2f}')}")
+col5.metric("BI-RADS 3 takip incelemesi", f"{res['n_followup'] * FOLLOWUP_EXAMS:,}",
+            help=f"{res['n_followup']:,} vaka x {FOLLOWUP_EXAMS} kontrol (6, 12, 24. ay)")
+
+st.subheader(f"Metrikler (ortalama ve %{ci} aralık)")
+st.dataframe(summary, use_container_width=True)
+
+st.subheader("Kategori başına beklenen kanser")
+st.dataframe(summarize_categories(res, ci), hide_index=True, use_container_width=True)
+st.caption("BI-RADS 0 (ek değerlendirme) ve 6 (kanıtlanmış kanser) verime katılmaz; vaka sayısına dahildir.")
@@ -0,0 +1,224 @@
+"""Dışa aktarım için yerel sahte alıcı: MLLP (HL7 v2) ve FHIR batch uç noktası.
+
+Hastane sistemi yerine geçer; gelen mesajları sayar, ACK/batch yanıtı döner ve
+saniyede alınan mesaj sayısını yazar. Hata enjeksiyonu ile yeniden deneme
+davranışı denenebilir (bağlantı koparma/503, reddetme, gecikme). --bench ile
+alıcıyı başlatıp birads_export göndericisini geçici bir giden kutusuyla ona
+bağlar, N kayıt kuyruğa ekler ve kuyruk derinliği ile verimi raporlar.
+Yalnızca localhost'ta dinler.
+
+    python tools/export_listener.py --mllp-port 2575 --http-port 8090 --fail-rate 0.1
+    python tools/export_listener.py --bench 5000 --format hl7
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import tornado.ioloop
+import tornado.iostream
+import tornado.tcpserver
+import tornado.web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MLLP_START, MLLP_END = b"\x0b", b"\x1c\x0d"
+
+
+class Counter:
+    def __init__(self):
+        self.received = 0
+        self.rejected = 0
+        self.failed = 0
+        self.seen = set()
+        self.duplicates = 0
+
+    def record(self, message_id):
+        if message_id in self.seen:
+            self.duplicates += 1
+        self.seen.add(message_id)
+        self.received += 1
+
+
+class Faults:
+    def __init__(self, fail_rate, reject_rate, delay_ms):
+        self.fail_rate = fail_rate
+        self.reject_rate = reject_rate
+        self.delay = delay_ms / 1000
+
+    def fail(self):
+        return random.random() < self.fail_rate
+
+    def reject(self):
+        return random.random() < self.reject_rate
+
+
+def hl7_ack(message, code):
+    fields = {s[:3]: s.split("|") for s in message.split("\r") if s}
+    msh = fields.get("MSH", [])
+    control_id = msh[9] if len(msh) > 9 else ""
+    when = datetime.now().strftime("%Y%m%d%H%M%S")
+    return f"MSH|^~\\&|LISTENER||BIRADS_APP||{when}||ACK^R01^ACK|{control_id}|P|2.5\rMSA|{code}|{control_id}\r", control_id
+
+
+class MllpServer(tornado.tcpserver.TCPServer):
+    def __init__(self, counter, faults):
+        super().__init__()
+        self.counter = counter
+        self.faults = faults
+
+    async def handle_stream(self, stream, address):
+        stream.set_nodelay(True)
+        try:
+            while True:
+                frame = await stream.read_until(MLLP_END, max_bytes=16 << 20)
+                if self.faults.delay:
+                    await asyncio.sleep(self.faults.delay)
+                if self.faults.fail():
+                    # Bağlantı kopması: gönderici yeniden bağlanıp toplu gönderimi tekrarlamalı
+                    self.counter.failed += 1
+                    stream.close()
+                    return
+                message = frame[:-len(MLLP_END)].lstrip(MLLP_START).decode("utf-8", "replace")
+                code = "AR" if self.faults.reject() else "AA"
+                ack, control_id = hl7_ack(message, code)
+                if code == "AA":
+                    self.counter.record(control_id)
+                else:
+                    self.counter.rejected += 1
+                await stream.write(MLLP_START + ack.encode("utf-8") + MLLP_END)
+        except tornado.iostream.StreamClosedError:
+            pass
+
+
+class FhirHandler(tornado.web.RequestHandler):
+    def initialize(self, counter, faults):
+        self.counter = counter
+        self.faults = faults
+
+    async def post(self):
+        if self.faults.delay:
+            await asyncio.sleep(self.faults.delay)
+        if self.faults.fail():
+            self.counter.failed += 1
+            raise tornado.web.HTTPError(503)
+        bundle = json.loads(self.request.body)
+        entries = []
+        for entry in bundle.get("entry", []):
+            message_id = entry["resource"]["identifier"][0]["value"]
+            if self.faults.reject():
+                self.counter.rejected += 1
+                entries.append({"response": {"status": "422 Unprocessable Entity"}})
+            else:
+                created = message_id not in self.counter.seen
+                self.counter.record(message_id)
+                entries.append({"response": {"status": "201 Created" if created else "200 OK"}})
+        self.set_header("Content-Type", "application/fhir+json")
+        self.write(json.dumps({"resourceType": "Bundle", "type": "batch-response", "entry": entries}))
+
+
+def start_listener(args, counter):
+    faults = Faults(args.fail_rate, args.reject_rate, args.delay_ms)
+    MllpServer(counter, faults).listen(args.mllp_port, address="127.0.0.1")
+    tornado.web.Application(
+        [(r"/fhir/?", FhirHandler, {"counter": counter, "faults": faults})],
+        log_function=lambda handler: None,  # Enjekte 503'ler sayaçta raporlanır
+    ).listen(args.http_port, address="127.0.0.1")
+
+
+def report(counter):
+    last = [counter.received, time.monotonic()]
+
+    def tick():
+        now = time.monotonic()
+        rate = (counter.received - last[0]) / (now - last[1])
+        last[:] = [counter.received, now]
+        print(f"alınan: {counter.received:,} ({rate:,.0f}/s) · reddedilen: {counter.rejected:,} · "
+              f"enjekte hata: {counter.failed:,} · tekrar: {counter.duplicates:,}", flush=True)
+
+    tornado.ioloop.PeriodicCallback(tick, 1000).start()
+
+
+def bench(args, counter):
+    # Alıcı ayrı iş parçacığında; gönderici ve kuyruk ölçümü ana iş parçacığında
+    ready = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        start_listener(args, counter)
+        ready.set()
+        tornado.ioloop.IOLoop.current().start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+
+    sys.path.insert(0, ROOT)
+    from birads_export import Exporter, Outbox
+
+    url = f"mllp://127.0.0.1:{args.mllp_port}" if args.format == "hl7" else f"http://127.0.0.1:{args.http_port}/fhir"
+    outbox = Outbox(os.path.join(tempfile.mkdtemp(prefix="birads_export_"), "export.sqlite"))
+    exporter = Exporter(url, outbox=outbox, batch_size=args.batch)
+    record = {"time": datetime.now().isoformat(timespec="seconds"), "reader": "bench", "category": "BI-RADS 4A",
+              "management": "Biyopsi önerilir", "inputs": {"finding_type": ["Kitle"]}}
+
+    start = time.monotonic()
+    latencies = []
+    for i in range(args.bench):
+        t = time.perf_counter()
+        exporter.enqueue(dict(record, case_id=f"B{i}"))
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    print(f"{args.bench:,} kayıt kuyruğa eklendi: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms / kayıt", flush=True)
+
+    while True:
+        time.sleep(0.5)
+        stats = exporter.stats()
+        print(f"kuyruk: {stats['pending']:,} bekleyen · {stats['sent']:,} gönderildi · {stats['failed']:,} reddedildi · "
+              f"son toplu gönderim: {stats['last_batch_ms'] or 0:.0f} ms · son hata: {stats['last_error'] or '-'}", flush=True)
+        if stats["pending"] == 0 or time.monotonic() - start > args.timeout:
+            break
+    elapsed = time.monotonic() - start
+    stats = exporter.stats()
+    print(f"{stats['sent']:,} mesaj {elapsed:.1f} s'de iletildi ({stats['sent'] / elapsed:,.0f} mesaj/s); "
+          f"alıcı: {counter.received:,} alındı, {counter.duplicates:,} tekrar, {counter.failed:,} enjekte hata")
+    exporter.stop()
+    return 0 if stats["pending"] == 0 else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--mllp-port", type=int, default=2575)
+    parser.add_argument("--http-port", type=int, default=8090, help="FHIR uç noktası: http://127.0.0.1:PORT/fhir")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="bağlantı koparma / HTTP 503 olasılığı")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="mesaj reddetme (AR / 422) olasılığı")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="mesaj/istek başına yapay gecikme")
+    parser.add_argument("--bench", type=int, default=0, help="N kayıt gönderip kuyruk ve verimi ölç")
+    parser.add_argument("--format", choices=["hl7", "fhir"], default="hl7", help="--bench ile kullanılacak biçim")
+    parser.add_argument("--batch", type=int, default=50, help="--bench toplu gönderim boyutu")
+    parser.add_argument("--timeout", type=float, default=120, help="--bench en uzun süre (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+    counter = Counter()
+
+    if args.bench:
+        return bench(args, counter)
+    start_listener(args, counter)
+    report(counter)
+    print(f"MLLP: 127.0.0.1:{args.mllp_port} · FHIR: http://127.0.0.1:{args.http_port}/fhir", flush=True)
+    try:
+        tornado.ioloop.IOLoop.current().start()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
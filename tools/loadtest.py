@@ -0,0 +1,294 @@
+"""Eşzamanlı oturum yük testi: birads_app.py'yi N simüle tarayıcı oturumuyla yükler.
+
+Her oturum Streamlit websocket protokolünü (/_stcore/stream, BackMsg/ForwardMsg)
+konuşur, gerçekçi widget değişikliği dizilerini tekrar oynatır ve her rerun'ın
+gecikmesini ölçer. N arttıkça p50/p95/p99 gecikme, sunucu CPU ve bellek raporlanır.
+Yalnızca localhost'a bağlanır.
+
+    python tools/loadtest.py --start --sessions 1,5,10,25
+    python tools/loadtest.py --url http://localhost:8501 --pid 12345 --sessions 1,10,50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+from tornado.websocket import websocket_connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# --- Senaryolar: (widget etiketi, değer) adımları ---
+SCENARIOS = {
+    "exam_check": [
+        ("Tetkik yeterli mi?", "Hayır"),
+        ("Tetkik yeterli mi?", "Evet"),
+    ],
+    "finding_multiselect": [
+        ("Bulgu Tipi", ["Kitle"]),
+        ("Bulgu Tipi", ["Kitle", "Asimetri"]),
+        ("Bulgu Tipi", ["Asimetri"]),
+        ("Asimetri Türü", "Gelişen"),
+        ("Bulgu Tipi", ["Asimetri", "Architectural Distortion"]),
+        ("Bulgu Tipi", []),
+    ],
+    "margin_change": [
+        ("Bulgu Tipi", ["Kitle"]),
+        ("Lezyon Şekli", "Düzensiz"),
+        ("Kenar Özelliği", "Spiküle"),
+        ("Kenar Özelliği", "Düzensiz"),
+        ("Lezyon Şekli", "Oval"),
+        ("Kitle 2 yıldır takipte stabil mi?", True),
+        ("Bulgu Tipi", []),
+    ],
+    "combined": [
+        ("Bulgu Tipi", ["Kitle", "Kalsifikasyon"]),
+        ("Kalsifikasyon Morfolojisi", "Pleomorfik"),
+        ("Kalsifikasyon Dağılımı", "Segmental"),
+        ("Lezyon Şekli", "Düzensiz"),
+        ("Kenar Özelliği", "Spiküle"),
+        ("Bulgu Tipi", ["Kitle"]),
+        ("Bulgu Tipi", []),
+    ],
+}
+
+
+class Session:
+    """Tek bir simüle tarayıcı oturumu."""
+
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+        self.conn = None
+        self.widgets = {}  # etiket -> (tür, id, seçenekler)
+        self.states = {}   # id -> WidgetState
+
+    async def connect(self):
+        self.conn = await websocket_connect(self.ws_url, subprotocols=["streamlit"])
+        return await self.rerun()
+
+    async def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+    async def rerun(self):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        seen = {}
+        while True:
+            payload = await self.conn.read_message()
+            if payload is None:
+                raise ConnectionError("Sunucu bağlantıyı kapattı")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(payload)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._register(fwd.delta.new_element, seen)
+            elif kind == "script_finished":
+                break
+        self.widgets = seen
+        # Artık görünmeyen widget'ların durumu gönderilmez (tarayıcı da göndermez)
+        ids = {w[1] for w in seen.values()}
+        self.states = {k: v for k, v in self.states.items() if k in ids}
+        return time.perf_counter() - start
+
+    def _register(self, element, seen):
+        kind = element.WhichOneof("type")
+        if kind in ("selectbox", "multiselect", "radio", "checkbox"):
+            proto = getattr(element, kind)
+            seen[proto.label] = (kind, proto.id, list(getattr(proto, "options", [])))
+
+    async def change(self, label, value):
+        if label not in self.widgets:
+            return None  # Bu dalda widget yok (ör. önceki adım farklı sonuç verdi)
+        kind, widget_id, options = self.widgets[label]
+        ws = WidgetState(id=widget_id)
+        if kind == "selectbox":
+            ws.string_value = value
+        elif kind == "multiselect":
+            ws.string_array_value.data[:] = value
+        elif kind == "radio":
+            ws.int_value = options.index(value)
+        else:
+            ws.bool_value = bool(value)
+        self.states[widget_id] = ws
+        return await self.rerun()
+
+
+async def run_session(ws_url, scenarios, iterations, think, latencies, errors):
+    session = Session(ws_url)
+    try:
+        latencies.append(("connect", await session.connect()))
+        for _ in range(iterations):
+            name = random.choice(scenarios)
+            for label, value in SCENARIOS[name]:
+                if think:
+                    await asyncio.sleep(random.uniform(0, 2 * think))
+                elapsed = await session.change(label, value)
+                if elapsed is not None:
+                    latencies.append((name, elapsed))
+    except Exception as e:  # Oturum hatası diğer oturumları durdurmaz; raporda sayılır
+        errors.append(repr(e))
+    finally:
+        await session.close()
+
+
+# --- Sunucu kaynak ölçümü ---
+def _proc_sample(pid):
+    """(CPU saniyesi, RSS bayt) döner; psutil varsa onu, yoksa /proc'u kullanır."""
+    try:
+        import psutil
+        p = psutil.Process(pid)
+        cpu = p.cpu_times()
+        return cpu.user + cpu.system, p.memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        tick = os.sysconf("SC_CLK_TCK")
+        return (int(fields[11]) + int(fields[12])) / tick, rss_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+async def monitor(pid, peaks, stop):
+    while not stop.is_set():
+        sample = _proc_sample(pid)
+        if sample:
+            peaks.append(sample[1])
+        try:
+            await asyncio.wait_for(stop.wait(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def run_level(ws_url, n, scenarios, iterations, think, pid):
+    latencies = []
+    errors = []
+    peaks = []
+    stop = asyncio.Event()
+    before = _proc_sample(pid) if pid else None
+    mon = asyncio.ensure_future(monitor(pid, peaks, stop)) if pid else None
+    wall = time.perf_counter()
+    await asyncio.gather(*[
+        run_session(ws_url, scenarios, iterations, think, latencies, errors) for _ in range(n)
+    ])
+    wall = time.perf_counter() - wall
+    stop.set()
+    if mon:
+        await mon
+    after = _proc_sample(pid) if pid else None
+
+    reruns = sorted(t for name, t in latencies if name != "connect")
+    row = {
+        "sessions": n,
+        "reruns": len(reruns),
+        "errors": len(errors),
+        "p50_ms": percentile(reruns, 50) * 1000,
+        "p95_ms": percentile(reruns, 95) * 1000,
+        "p99_ms": percentile(reruns, 99) * 1000,
+        "reruns_per_s": len(reruns) / wall if wall else float("nan"),
+        "cpu_pct": float("nan"),
+        "rss_mb": float("nan"),
+    }
+    if before and after:
+        row["cpu_pct"] = (after[0] - before[0]) / wall * 100
+        row["rss_mb"] = max(peaks + [after[1]]) / 2 ** 20
+    return row, errors
+
+
+def check_local(url):
+    host = urllib.parse.urlparse(url).hostname
+    if host not in LOCAL_HOSTS:
+        sys.exit(f"Yük testi yalnızca localhost'a karşı çalışır (verilen: {host})")
+
+
+def start_server(port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "birads_app.py"),
+         "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    health = f"http://127.0.0.1:{port}/_stcore/health"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(health, timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    sys.exit("Streamlit sunucusu başlatılamadı")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default="http://localhost:8501")
+    parser.add_argument("--start", action="store_true", help="birads_app.py sunucusunu kendisi başlatır")
+    parser.add_argument("--port", type=int, default=8599, help="--start ile kullanılacak port")
+    parser.add_argument("--pid", type=int, help="CPU/bellek ölçümü için sunucu süreç kimliği")
+    parser.add_argument("--sessions", default="1,5,10,25", help="virgülle ayrılmış N değerleri")
+    parser.add_argument("--iterations", type=int, default=10, help="oturum başına senaryo sayısı")
+    parser.add_argument("--think", type=float, default=0.0, help="adımlar arası ortalama bekleme (s)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="yalnızca seçilen senaryolar (tekrarlanabilir)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    proc = None
+    url = args.url
+    pid = args.pid
+    if args.start:
+        proc = start_server(args.port)
+        url = f"http://127.0.0.1:{args.port}"
+        pid = proc.pid
+    check_local(url)
+    parsed = urllib.parse.urlparse(url)
+    ws_url = f"ws://{parsed.netloc}{parsed.path.rstrip('/')}/_stcore/stream"
+    scenarios = args.scenario or sorted(SCENARIOS)
+
+    header = f"{'N':>5} {'rerun':>7} {'hata':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rerun/s':>8} {'CPU %':>7} {'RSS MB':>8}"
+    print(header)
+    print("-" * len(header))
+    try:
+        for n in [int(x) for x in args.sessions.split(",")]:
+            row, errors = asyncio.run(run_level(ws_url, n, scenarios, args.iterations, args.think, pid))
+            print(f"{row['sessions']:>5} {row['reruns']:>7} {row['errors']:>5} {row['p50_ms']:>8.1f} "
+                  f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['reruns_per_s']:>8.1f} "
+                  f"{row['cpu_pct']:>7.1f} {row['rss_mb']:>8.1f}", flush=True)
+            for e in sorted(set(errors))[:3]:
+                print(f"      ! {e}")
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Kural sürümleri arası fark analizi: iki uygulama sürümünü tüm girdi kombinasyonlarında karşılaştırır.
+
+Her sürüm sahte (fake) bir streamlit modülüyle çalıştırılır: her widget çağrısı
+bir karar noktasıdır ve betik, görünen widget'ların tüm seçenek
+kombinasyonları üzerinde derinlik öncelikli dolaşılır (widget görünürlüğü
+önceki seçimlere bağlı olduğundan ağaç betiğin kendisinden çıkar). Ağaç alt
+ağaçlara bölünüp süreç havuzunda paralel dolaşılır. Sonuç kartından (result-card)
+kategori ve yönetim okunur; iki sürümün vakaları ortak girdileri üzerinden
+eşleştirilir ve kategorisi veya yönetimi değişen her vaka tabloya yazılır.
+
+    python tools/rules_diff.py                                   # "eski kod version.py" -> birads_app.py
+    python tools/rules_diff.py git:HEAD birads_app.py            # son commit -> çalışma kopyası
+    python tools/rules_diff.py git:v1.0:birads_app.py yeni.py --csv fark.csv
+
+Sürüm "git:REV[:yol]" ise o commit geçici klasöre çıkarılır; betik kendi
+commit'indeki birads_* modülleriyle çalışır.
+"""
+
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OLD = "eski kod version.py"
+DEFAULT_NEW = "birads_app.py"
+CARD = re.compile(r'<div class="result-card birads-[^"]*">(.*?)</div>', re.S)
+# Ana süreç alt ağaçları bu kadar parçaya bölünene kadar genişletir (iş başına)
+SPLIT_FACTOR = 8
+
+
+class _Stop(Exception):
+    pass
+
+
+class _Block:
+    """expander/columns/spinner vb. için bağlam yöneticisi; çağrıları sahte st'ye yönlendirir."""
+
+    def __init__(self, st=None):
+        self._st = st
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        if self._st is not None:
+            return getattr(self._st, name)
+        return lambda *a, **k: _Block()
+
+
+class _SessionState(dict):
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+
+def _fake_streamlit(choices, widgets, output):
+    """Seçimleri sırayla `choices`tan alan, görünen widget'ları `widgets`a yazan sahte modül."""
+    st = types.ModuleType("streamlit")
+
+    def choose(label, options):
+        i = len(widgets)
+        widgets.append((label, options))
+        return options[choices[i] if i < len(choices) else 0]
+
+    def stop():
+        raise _Stop()
+
+    def subsets(options):
+        return [list(c) for r in range(len(options) + 1) for c in itertools.combinations(options, r)]
+
+    st.__getattr__ = lambda name: (lambda *a, **k: _Block())
+    st.session_state = _SessionState()
+    st.query_params = {}
+    st.column_config = _Block()
+    st.stop = stop
+    st.selectbox = st.radio = lambda label, options, *a, **k: choose(label, list(options))
+    st.checkbox = lambda label, *a, **k: choose(label, [False, True])
+    st.multiselect = lambda label, options, *a, **k: choose(label, subsets(list(options)))
+    st.markdown = lambda body, *a, **k: output.append(body)
+    st.columns = lambda spec, *a, **k: [_Block(st) for _ in range(spec if isinstance(spec, int) else len(spec))]
+    st.tabs = lambda labels, *a, **k: [_Block(st) for _ in labels]
+    st.expander = st.spinner = st.container = lambda *a, **k: _Block(st)
+    st.file_uploader = lambda *a, **k: None
+    st.text_input = st.text_area = lambda *a, **k: ""
+    st.number_input = lambda *a, value=None, **k: value
+    st.button = lambda *a, **k: False
+    st.data_editor = lambda data, *a, **k: data
+    st.cache_data = st.cache_resource = lambda *a, **k: a[0] if a and callable(a[0]) else (lambda f: f)
+    scriptrunner = types.ModuleType("streamlit.runtime.scriptrunner")
+    scriptrunner.get_script_run_ctx = lambda: None
+    return st, scriptrunner
+
+
+# --- Sürüm yükleme (her işçi süreçte) ---
+_loaded = {}
+
+
+def _activate(root):
+    # Her sürüm kendi birads_* modülleriyle çalışmalı: kök değişince önceki sürümün modülleri atılır
+    if _loaded.get("root") == root:
+        return
+    old = _loaded.get("root")
+    if old:
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__dict__", {}).get("__file__")
+            if isinstance(path, str) and path.startswith(old + os.sep):
+                del sys.modules[name]
+        sys.path.remove(old)
+    sys.path.insert(0, root)
+    _loaded["root"] = root
+    _loaded["code"] = {}
+
+
+def _run(root, script, choices):
+    _activate(root)
+    code = _loaded["code"].get(script)
+    if code is None:
+        with open(script, encoding="utf-8") as f:
+            code = _loaded["code"][script] = compile(f.read(), script, "exec")
+    widgets, output = [], []
+    st, scriptrunner = _fake_streamlit(choices, widgets, output)
+    sys.modules["streamlit"] = st
+    sys.modules["streamlit.runtime.scriptrunner"] = scriptrunner
+    try:
+        exec(code, {"__name__": "__main__", "__file__": script})
+    except _Stop:
+        pass
+    return widgets, output
+
+
+def _parse_card(output):
+    for body in output:
+        match = CARD.search(body)
+        if match:
+            parts = match.group(1).split("<br>")
+            management = re.sub(r"</?small>", "", parts[2]) if len(parts) > 2 else ""
+            return parts[0].strip(), management.strip()
+    return "", ""
+
+
+def _case(widgets, full):
+    inputs = []
+    for (label, options), c in zip(widgets, full):
+        value = options[c]
+        if isinstance(value, list):
+            value = "+".join(value) or "-"
+        elif isinstance(value, bool):
+            value = "✓" if value else "✗"
+        inputs.append((label, value))
+    return tuple(inputs)
+
+
+def explore(root, script, prefix, limit=None):
+    """`prefix` ile başlayan alt ağacı dolaşır; (vakalar, genişletilmemiş düğümler) döner."""
+    cases = {}
+    stack = [prefix]
+    visited = 0
+    while stack and (limit is None or visited < limit):
+        choices = stack.pop(0) if limit is not None else stack.pop()
+        widgets, output = _run(root, script, choices)
+        visited += 1
+        full = choices + [0] * (len(widgets) - len(choices))
+        cases[_case(widgets, full)] = _parse_card(output)
+        for i in range(len(choices), len(widgets)):
+            for c in range(1, len(widgets[i][1])):
+                stack.append(full[:i] + [c])
+    return cases, stack
+
+
+def _explore_job(args):
+    return explore(*args)[0]
+
+
+def enumerate_version(pool, jobs, root, script):
+    # Önce ana süreçte genişlikçe birkaç düğüm dolaşılır, kalan alt ağaçlar işçilere dağıtılır
+    cases, frontier = explore(root, script, [], limit=jobs * SPLIT_FACTOR if jobs > 1 else None)
+    if frontier:
+        for part in pool.map(_explore_job, [(root, script, p) for p in frontier]):
+            cases.update(part)
+    return cases
+
+
+def resolve(spec, workdir):
+    """Sürüm tanımını (betik yolu veya git:REV[:yol]) (kök klasör, betik) ikilisine çevirir."""
+    if spec.startswith("git:"):
+        rev, _, path = spec[4:].partition(":")
+        target = tempfile.mkdtemp(prefix="rev_", dir=workdir)
+        archive = subprocess.run(["git", "-C", ROOT, "archive", rev], check=True, capture_output=True).stdout
+        subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+        return target, os.path.join(target, path or DEFAULT_NEW)
+    script = os.path.abspath(spec if os.path.isabs(spec) or os.path.exists(spec) else os.path.join(ROOT, spec))
+    if not os.path.exists(script):
+        sys.exit(f"Betik bulunamadı: {spec}")
+    return os.path.dirname(script), script
+
+
+def match_cases(old, new):
+    """Ortak girdilerde aynı değeri taşıyan eski/yeni vaka çiftlerini üretir.
+
+    Bir sürümde sorulmayan widget diğerindeki her değeriyle eşleşir (ör. yalnızca
+    yeni sürümde sorulan stabilite sorusu). Eşleşmeyen vakalar ayrıca döner.
+    """
+    def bucket(case):
+        return tuple(v for label, v in case if label in ("Tetkik yeterli mi?", "Bulgu Tipi"))
+
+    old_by_bucket = defaultdict(list)
+    for case in old:
+        old_by_bucket[bucket(case)].append((case, dict(case)))
+    pairs, matched_old, only_new = [], set(), []
+    for case in new:
+        inputs = dict(case)
+        found = False
+        for old_case, old_inputs in old_by_bucket.get(bucket(case), ()):
+            if all(inputs[k] == old_inputs[k] for k in inputs.keys() & old_inputs.keys()):
+                pairs.append((old_case, case))
+                matched_old.add(old_case)
+                found = True
+        if not found:
+            only_new.append(case)
+    only_old = [c for c in old if c not in matched_old]
+    return pairs, only_old, only_new
+
+
+def _describe(old_case, new_case):
+    # Kısa gösterim: parantezli açıklamalar atılır, işaretsiz onay kutuları yazılmaz
+    inputs = dict(old_case)
+    inputs.update(new_case)
+    parts = []
+    for label, value in inputs.items():
+        label = re.sub(r"\s*\(.*?\)|\?$", "", label)
+        if value == "✗":
+            continue
+        parts.append(label if value == "✓" else f"{label}={value}")
+    return "; ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("old", nargs="?", default=DEFAULT_OLD)
+    parser.add_argument("new", nargs="?", default=DEFAULT_NEW)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--csv", help="değişen tüm vakaları CSV olarak yaz")
+    parser.add_argument("--limit", type=int, default=40, help="ekranda gösterilecek en fazla satır")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="rules_diff_") as workdir:
+        # Betiklerin yan etkileri (anlık kayıt, önbellek) geçici klasöre gider
+        os.environ["BIRADS_DATA_DIR"] = os.path.join(workdir, "data")
+        versions = [resolve(args.old, workdir), resolve(args.new, workdir)]
+        with ProcessPoolExecutor(max(1, args.jobs)) as pool:
+            old, new = (enumerate_version(pool, args.jobs, root, script) for root, script in versions)
+            old, new = dict(old), dict(new)
+    pairs, only_old, only_new = match_cases(old, new)
+
+    rows = []
+    for old_case, new_case in pairs:
+        (old_cat, old_mgmt), (new_cat, new_mgmt) = old[old_case], new[new_case]
+        if (old_cat, old_mgmt) != (new_cat, new_mgmt):
+            rows.append({
+                "eski kategori": old_cat, "yeni kategori": new_cat,
+                "eski yönetim": old_mgmt, "yeni yönetim": new_mgmt,
+                "girdiler": _describe(old_case, new_case),
+            })
+    elapsed = time.perf_counter() - start
+    diff = pd.DataFrame(rows, columns=["eski kategori", "yeni kategori", "eski yönetim", "yeni yönetim", "girdiler"])
+
+    print(f"Eski: {len(old)} vaka, yeni: {len(new)} vaka, {len(pairs)} eşleşen çift, "
+          f"{len(diff)} değişiklik ({elapsed:.1f} s, {args.jobs} iş)")
+    if only_old or only_new:
+        print(f"Eşleşmeyen: yalnızca eski {len(only_old)}, yalnızca yeni {len(only_new)}")
+    if len(diff):
+        summary = (diff.groupby(["eski kategori", "yeni kategori"], dropna=False).size()
+                   .rename("vaka").reset_index().sort_values("vaka", ascending=False))
+        print("\nKategori geçişleri:")
+        print(summary.to_string(index=False))
+        print(f"\nDeğişen vakalar (ilk {min(args.limit, len(diff))}):")
+        for row in diff.head(args.limit).itertuples(index=False):
+            print(f"{row[0] or '-':<10} → {row[1] or '-':<10} | {row[2] or '-'} → {row[3] or '-'} | {row[4]}")
+    if args.csv:
+        diff.to_csv(args.csv, index=False)
+        print(f"\n{len(diff)} satır yazıldı: {args.csv}")
+    return 1 if len(diff) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())